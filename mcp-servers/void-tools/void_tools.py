@@ -1,60 +1,256 @@
 from mcp.server.fastmcp import FastMCP
 import subprocess
-import shutil
 import os
 import json
-import urllib.request
-import re
 from pathlib import Path
-from bs4 import BeautifulSoup
-import requests
-from rank_bm25 import BM25Okapi
-import pickle
-import time
+from concurrent.futures import ThreadPoolExecutor
 import sys
+import functools
+import hashlib
+import email.utils
+import random
+import tempfile
+import threading
+import time
+
+# requests, bs4 and bm25s are imported where they are used so the package
+# and service tools don't pay for them at server startup
 
 # Initialize FastMCP server
 mcp = FastMCP("void-tools")
 
 CACHE_DIR = Path.home() / ".cache" / "mycel" / "void_docs"
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
-INDEX_FILE = CACHE_DIR / "search_index.pkl"
+INDEX_FILE = CACHE_DIR / "search_index.json"
+BM25_DIR = CACHE_DIR / "bm25s"
+PARSED_CACHE = CACHE_DIR / "parsed"
+PARSED_CACHE.mkdir(exist_ok=True)
 DOCS_URL = "https://docs.voidlinux.org"
+MAX_PAGE_BYTES = 2_000_000
+# Crawl politeness: at most CRAWL_SLOTS requests in flight to the docs
+# host, with retries and backoff on 429/503
+CRAWL_SLOTS = threading.Semaphore(4)
+CRAWL_ATTEMPTS = 4
+MAX_RETRY_DELAY = 30.0
+# Common English words are dropped at index and query time so they never
+# enter the posting lists
+STOPWORDS = "en"
+
+@functools.cache
+def _session():
+    """Shared across tool calls and crawler threads so connections (and TLS
+    sessions) are reused."""
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.mount("https://", HTTPAdapter(pool_connections=16, pool_maxsize=32, max_retries=3))
+    return session
 
 def log(msg):
     sys.stderr.write(f"[void-tools] {msg}\n")
     sys.stderr.flush()
 
+def _retry_delay(retry_after, attempt):
+    """Seconds to wait before retrying a 429/503, honoring Retry-After."""
+    if retry_after:
+        try:
+            return min(float(retry_after), MAX_RETRY_DELAY)
+        except ValueError:
+            try:
+                when = email.utils.parsedate_to_datetime(retry_after)
+                return min(max(when.timestamp() - time.time(), 0.0), MAX_RETRY_DELAY)
+            except (TypeError, ValueError):
+                pass
+    return min(2 ** attempt + random.uniform(0, 1), MAX_RETRY_DELAY)
+
+def man_text(page):
+    """Render a man page as plain text, i.e. `man page | col -b` without a shell.
+
+    Returns (returncode, text, stderr) where returncode is man's.
+    """
+    # man's stderr goes to a file rather than a pipe nobody reads until col
+    # is done, which a chatty man could fill and stall the pipeline on
+    with tempfile.TemporaryFile() as errfile:
+        man = subprocess.Popen(["man", "--", page], stdout=subprocess.PIPE, stderr=errfile)
+        try:
+            col = subprocess.Popen(["col", "-b"], stdin=man.stdout, stdout=subprocess.PIPE, text=True)
+            man.stdout.close()  # col owns the read end now
+            text, _ = col.communicate()
+        except BaseException:
+            # col didn't start (or we were interrupted); don't leave man behind
+            man.kill()
+            raise
+        finally:
+            man.stdout.close()
+            code = man.wait()
+        errfile.seek(0)
+        err = errfile.read().decode(errors="replace")
+    return code, text, err
+
 # --- RAG Engine ---
 
 class VoidSearchEngine:
     def __init__(self):
         self.documents = [] # List of {"title": str, "content": str, "url": str}
-        self.bm25 = None
-        self.tokenized_corpus = []
+        self.retriever = None
+        self.http_meta = {} # url -> {"etag": str, "last_modified": str}
         self.loaded = False
+        # Set when the last build_index fetched nothing and kept the old corpus
+        self.kept_previous = False
+        # Repeated queries are answered from memory; cleared on rebuild
+        self._ranked = functools.lru_cache(maxsize=256)(self._rank)
 
     def load_index(self):
         if self.loaded:
             return True
         
-        if INDEX_FILE.exists():
+        if INDEX_FILE.exists() and BM25_DIR.exists():
             try:
-                with open(INDEX_FILE, "rb") as f:
-                    data = pickle.load(f)
+                with open(INDEX_FILE, "r") as f:
+                    data = json.load(f)
                     self.documents = data["documents"]
-                    self.tokenized_corpus = data["corpus"]
-                    self.bm25 = BM25Okapi(self.tokenized_corpus)
-                    self.loaded = True
+                    self.http_meta = data.get("http_meta", {})
+                # bm25s persists the precomputed sparse score matrix, so
+                # loading skips all per-document scoring work
+                import bm25s
+                self.retriever = bm25s.BM25.load(str(BM25_DIR))
+                self.loaded = True
                 return True
             except Exception as e:
                 log(f"Failed to load index: {e}")
                 return False
         return False
 
+    def _fetch_page(self, page, meta):
+        """Conditionally GET a handbook page.
+
+        Returns (page, url, status, content, meta); status is 304 when the
+        cached copy described by `meta` is still current.
+        """
+        url = f"{DOCS_URL}{page}"
+        headers = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+        try:
+            for attempt in range(CRAWL_ATTEMPTS):
+                # Bounded concurrency plus jitter keeps the crawl polite
+                with CRAWL_SLOTS:
+                    time.sleep(random.uniform(0.1, 0.3))
+                    log(f"Fetching {url}...")
+                    with _session().get(url, headers=headers, timeout=10, stream=True) as resp:
+                        if resp.status_code == 304:
+                            return page, url, 304, None, meta
+                        if resp.status_code == 200:
+                            new_meta = {
+                                "etag": resp.headers.get("ETag"),
+                                "last_modified": resp.headers.get("Last-Modified"),
+                            }
+                            content = resp.raw.read(MAX_PAGE_BYTES, decode_content=True)
+                            return page, url, 200, content, new_meta
+                        if resp.status_code not in (429, 503):
+                            log(f"Error fetching {url}: HTTP {resp.status_code}")
+                            break
+                        delay = _retry_delay(resp.headers.get("Retry-After"), attempt)
+                # Back off outside the slot so other pages keep moving
+                if attempt + 1 < CRAWL_ATTEMPTS:
+                    log(f"{url} returned {resp.status_code}, retrying in {delay:.1f}s")
+                    time.sleep(delay)
+            else:
+                log(f"Giving up on {url} after {CRAWL_ATTEMPTS} attempts")
+        except Exception as e:
+            log(f"Error fetching {url}: {e}")
+        return page, url, None, None, {}
+
+    def _parse_page(self, page, url, content):
+        chunks = []
+        from bs4 import BeautifulSoup, SoupStrainer
+
+        # Only <title> and <main> are used; lxml skips building the rest
+        soup = BeautifulSoup(content, 'lxml', parse_only=SoupStrainer(["title", "main"]))
+        main_content = soup.find('main')
+        if main_content:
+            # Split by headers to create chunks
+            current_title = soup.title.string if soup.title else page
+            current_text = []
+            
+            for element in main_content.find_all(['h1', 'h2', 'h3', 'p']):
+                if element.name == 'p':
+                    text = element.get_text().strip()
+                    if text:
+                        current_text.append(text)
+                else:
+                    if current_text:
+                        chunks.append({
+                            "title": current_title,
+                            "content": " ".join(current_text),
+                            "url": url
+                        })
+                    current_title = element.get_text().strip()
+                    current_text = []
+                    
+            if current_text:
+                chunks.append({
+                    "title": current_title,
+                    "content": " ".join(current_text),
+                    "url": url
+                })
+        return chunks
+
+    def _parsed_path(self, url):
+        return PARSED_CACHE / f"{hashlib.sha1(url.encode()).hexdigest()}.json"
+
+    def _load_parsed(self, url, meta):
+        """Return cached chunks for `url` if they match the page validator."""
+        validator = meta.get("etag") or meta.get("last_modified")
+        if not validator:
+            return None
+        try:
+            with open(self._parsed_path(url), "r") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if data.get("validator") != validator:
+            return None
+        return data["chunks"]
+
+    def _store_parsed(self, url, meta, chunks):
+        validator = meta.get("etag") or meta.get("last_modified")
+        if not validator:
+            return
+        try:
+            with open(self._parsed_path(url), "w") as f:
+                json.dump({"validator": validator, "chunks": chunks}, f)
+        except OSError as e:
+            log(f"Failed to cache parsed {url}: {e}")
+
+    def _man_summary(self, page):
+        try:
+            code, text, _ = man_text(page)
+            if code == 0:
+                return {
+                    "title": f"Man Page: {page}",
+                    "content": text[:2000], # First 2000 chars as summary
+                    "url": f"man://{page}"
+                }
+        except:
+            pass
+        return None
+
     def build_index(self):
         log("Building index...")
+        # Chunks from the previous build are reused for pages that come
+        # back 304 Not Modified
+        self.load_index()
+        previous_chunks = {}
+        for doc in self.documents:
+            previous_chunks.setdefault(doc["url"], []).append(doc)
+        previous_meta = self.http_meta
+        previous_documents = self.documents
         self.documents = []
+        self.http_meta = {}
         
         # 1. Scrape Void Handbook (Simplified: Main sections)
         # We'll crawl the sidebar links if possible, or just key pages
@@ -68,65 +264,91 @@ class VoidSearchEngine:
             "/config/services/user-services.html"
         ]
         
+        # Only send validators for pages whose chunks we still have, either
+        # from the last index or from the per-page parse cache
+        cached = {}
+        request_meta = {}
         for page in pages:
             url = f"{DOCS_URL}{page}"
-            try:
-                log(f"Fetching {url}...")
-                resp = requests.get(url, timeout=10)
-                if resp.status_code == 200:
-                    soup = BeautifulSoup(resp.content, 'html.parser')
-                    main_content = soup.find('main')
-                    if main_content:
-                        # Split by headers to create chunks
-                        current_title = soup.title.string if soup.title else page
-                        current_text = []
-                        
-                        for element in main_content.descendants:
-                            if element.name in ['h1', 'h2', 'h3']:
-                                if current_text:
-                                    self.documents.append({
-                                        "title": current_title,
-                                        "content": " ".join(current_text),
-                                        "url": url
-                                    })
-                                current_title = element.get_text().strip()
-                                current_text = []
-                            elif element.name == 'p':
-                                current_text.append(element.get_text().strip())
-                                
-                        if current_text:
-                            self.documents.append({
-                                "title": current_title,
-                                "content": " ".join(current_text),
-                                "url": url
-                            })
-            except Exception as e:
-                log(f"Error fetching {url}: {e}")
+            meta = previous_meta.get(url, {})
+            chunks = previous_chunks.get(url) or self._load_parsed(url, meta)
+            if chunks is not None:
+                cached[url] = chunks
+                request_meta[url] = meta
+
+        # Fetches are network-bound, so overlap them and parse afterwards
+        with ThreadPoolExecutor(max_workers=8) as ex:
+            responses = list(ex.map(
+                lambda p: self._fetch_page(p, request_meta.get(f"{DOCS_URL}{p}", {})),
+                pages,
+            ))
+
+        for page, url, status, content, meta in responses:
+            if status == 304:
+                chunks = cached[url]
+            elif status == 200:
+                # Servers that ignore conditional GETs still send validators;
+                # an unchanged one means the parsed chunks are still good
+                chunks = self._load_parsed(url, meta)
+                if chunks is None:
+                    try:
+                        chunks = self._parse_page(page, url, content)
+                    except Exception as e:
+                        log(f"Error parsing {url}: {e}")
+                        continue
+                    self._store_parsed(url, meta, chunks)
+            elif url in cached:
+                # Fetch failed (offline, HTTP error, retries used up): keep
+                # the page's previous chunks and validators
+                log(f"Keeping previous copy of {url}")
+                chunks, meta = cached[url], request_meta[url]
+            else:
+                continue
+            self.documents.extend(chunks)
+            self.http_meta[url] = meta
+
+        # No handbook page at all (offline with nothing cached?): the man
+        # pages alone would replace the whole corpus, so keep the previous
+        # one, which the retriever and the ranking cache still describe
+        self.kept_previous = not self.documents and bool(previous_documents)
+        if self.kept_previous:
+            log("No documentation fetched, keeping existing index")
+            self.documents = previous_documents
+            self.http_meta = previous_meta
+            return len(self.documents)
 
         # 2. Add local man page summaries (xbps, sv)
         man_pages = ["xbps-install", "xbps-query", "xbps-remove", "xbps-reconfigure", "sv", "runit", "chroot"]
-        for page in man_pages:
-            try:
-                proc = subprocess.run(f"man {page} | col -b", shell=True, capture_output=True, text=True)
-                if proc.returncode == 0:
-                    self.documents.append({
-                        "title": f"Man Page: {page}",
-                        "content": proc.stdout[:2000], # First 2000 chars as summary
-                        "url": f"man://{page}"
-                    })
-            except:
-                pass
+        with ThreadPoolExecutor(max_workers=8) as ex:
+            summaries = list(ex.map(self._man_summary, man_pages))
+        self.documents.extend(doc for doc in summaries if doc)
 
-        # Build BM25
-        self.tokenized_corpus = [doc["content"].lower().split() for doc in self.documents]
-        self.bm25 = BM25Okapi(self.tokenized_corpus)
+        if not self.documents:
+            return 0
+
+        # An unchanged corpus keeps its persisted scores (IDF, doc lengths
+        # and per-token weights are all baked into the retriever)
+        if self.retriever is None or self.documents != previous_documents:
+            # Build BM25 (scores are computed eagerly at index time)
+            import bm25s
+            corpus_tokens = bm25s.tokenize(
+                [doc["content"] for doc in self.documents],
+                stopwords=STOPWORDS,
+                show_progress=False,
+            )
+            self.retriever = bm25s.BM25(k1=1.5, b=0.75)
+            self.retriever.index(corpus_tokens, show_progress=False)
+            self._ranked.cache_clear()
+            self.retriever.save(str(BM25_DIR))
+        else:
+            log("Documentation unchanged, keeping existing index")
         self.loaded = True
         
         # Save to cache
-        with open(INDEX_FILE, "wb") as f:
-            pickle.dump({
+        with open(INDEX_FILE, "w") as f:
+            json.dump({
                 "documents": self.documents,
-                "corpus": self.tokenized_corpus
+                "http_meta": self.http_meta
             }, f)
             
         return len(self.documents)
@@ -137,28 +359,49 @@ class VoidSearchEngine:
             if count == 0:
                 return ["Failed to build documentation index."]
         
-        tokenized_query = query.lower().split()
-        if not self.bm25:
+        if not self.retriever:
              return ["Index not ready."]
              
-        results = self.bm25.get_top_n(tokenized_query, self.documents, n=n)
+        import bm25s
+        tokens = bm25s.tokenize(
+            [query], stopwords=STOPWORDS, return_ids=False, show_progress=False
+        )[0]
+        # Terms outside the vocabulary have no row in the score matrix; drop
+        # them so they neither reach the scorer nor split the cache key
+        vocab = self.retriever.vocab_dict
+        tokens = tuple(t for t in tokens if t in vocab)
+        if not tokens:
+            return []
+        return list(self._ranked(tokens, n))
+
+    def _rank(self, tokens, n):
+        k = min(n, len(self.documents))
+        results, scores = self.retriever.retrieve([list(tokens)], k=k, show_progress=False)
         
         formatted = []
-        for doc in results:
+        for i, score in zip(results[0], scores[0]):
+            # Documents sharing no query term score 0; don't pad with them
+            if score <= 0:
+                continue
+            doc = self.documents[i]
             formatted.append(f"### {doc['title']}\nSource: {doc['url']}\n\n{doc['content'][:500]}...")
             
-        return formatted
+        return tuple(formatted)
 
-search_engine = VoidSearchEngine()
+@functools.cache
+def _get_engine():
+    """Return the process-wide search engine, loading the index only once."""
+    engine = VoidSearchEngine()
+    engine.load_index()
+    return engine
 
 # --- Tools ---
 
-def run_command(cmd):
-    """Run a shell command and return output"""
+def run_command(argv):
+    """Run a command (argv list, no shell) and return output"""
     try:
         result = subprocess.run(
-            cmd, 
-            shell=True, 
+            argv, 
             check=True, 
             capture_output=True, 
             text=True
@@ -166,27 +409,32 @@ def run_command(cmd):
         return result.stdout.strip()
     except subprocess.CalledProcessError as e:
         return f"Error: {e.stderr}"
+    except FileNotFoundError:
+        return f"Error: command not found: {argv[0]}"
 
 @mcp.tool()
 def xbps_search(query: str) -> str:
     """Search for packages in the Void Linux repository"""
-    return run_command(f"xbps-query -Rs '{query}'")
+    return run_command(["xbps-query", "-Rs", "--", query])
 
 @mcp.tool()
 def xbps_install(package: str) -> str:
     """Install a package (requires confirmation)"""
-    return run_command(f"sudo xbps-install -S {package}")
+    return run_command(["sudo", "xbps-install", "-S", "--", package])
 
 @mcp.tool()
 def xbps_remove(package: str) -> str:
     """Remove a package (requires confirmation)"""
-    return run_command(f"sudo xbps-remove -R {package}")
+    return run_command(["sudo", "xbps-remove", "-R", "--", package])
 
 @mcp.tool()
 def service_status() -> str:
     """Check status of all runit services"""
     if os.path.exists("/var/service"):
-        return run_command("sv status /var/service/*")
+        services = sorted(os.listdir("/var/service"))
+        if not services:
+            return "No services enabled in /var/service."
+        return run_command(["sv", "status", *(f"/var/service/{s}" for s in services)])
     return "Runit service directory /var/service not found."
 
 @mcp.tool()
@@ -194,30 +442,41 @@ def service_control(service: str, action: str) -> str:
     """Control a service (start, stop, restart)"""
     if action not in ["start", "stop", "restart", "status"]:
         return "Invalid action. Use start, stop, restart, or status."
-    return run_command(f"sudo sv {action} {service}")
+    return run_command(["sudo", "sv", action, service])
 
 @mcp.tool()
 def search_man_pages(query: str) -> str:
     """Search installed man pages for a keyword and return summaries"""
-    return run_command(f"apropos '{query}'")
+    return run_command(["apropos", "--", query])
 
 @mcp.tool()
 def read_man_page(page: str) -> str:
     """Read a specific man page"""
-    return run_command(f"man {page} | col -b")
+    try:
+        code, text, err = man_text(page)
+    except OSError as e:
+        return f"Error: {e}"
+    if code != 0:
+        return f"Error: {err}"
+    return text.strip()
 
 @mcp.tool()
 def search_void_handbook(query: str) -> str:
     """Search the Void Linux Handbook and documentation using RAG.
     Use this to understand how to configure the system, manage services, or solve errors.
     """
-    results = search_engine.search(query)
+    results = _get_engine().search(query)
+    if not results:
+        return "No matching documentation found."
     return "\n\n".join(results)
 
 @mcp.tool()
 def refresh_documentation_index() -> str:
     """Force rebuild of the documentation search index"""
-    count = search_engine.build_index()
+    engine = _get_engine()
+    count = engine.build_index()
+    if engine.kept_previous:
+        return f"Rebuild failed: no documentation could be fetched. Kept the existing index ({count} chunks)."
     return f"Index rebuilt with {count} chunks."
 
 if __name__ == "__main__":
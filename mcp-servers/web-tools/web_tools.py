@@ -1,61 +1,121 @@
 from mcp.server.fastmcp import FastMCP
 from duckduckgo_search import DDGS
-import requests
-from bs4 import BeautifulSoup
+import aiohttp
+import asyncio
+from bs4 import BeautifulSoup, SoupStrainer
+from contextlib import asynccontextmanager
 import re
 
+@asynccontextmanager
+async def _lifespan(server):
+    try:
+        yield
+    finally:
+        # Close the shared session (and its pooled connections) on shutdown
+        if _HTTP is not None and not _HTTP.closed:
+            await _HTTP.close()
+
 # Initialize FastMCP server
-mcp = FastMCP("web-tools")
+mcp = FastMCP("web-tools", lifespan=_lifespan)
+
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+}
+
+# Shared across tool calls so connections (and TLS sessions) are reused.
+# Created lazily because aiohttp sessions must be bound to the running loop.
+_HTTP = None
+
+# Only the page body is ever read, so skip parsing <head> entirely
+BODY_STRAINER = SoupStrainer("body")
+
+# Whitespace cleanup: collapse runs of spaces/tabs, then fold any line
+# break with surrounding blanks (including blank lines) into one newline
+_WS = re.compile(r'[ \t\x0b\x0c\r]+')
+_NL = re.compile(r' ?\n\s*')
+
+MAX_PAGE_BYTES = 2_000_000
+MAX_TEXT_CHARS = 10000
+RAW_TEXT_CHARS = 30000
+
+def _http():
+    global _HTTP
+    if _HTTP is None or _HTTP.closed:
+        _HTTP = aiohttp.ClientSession(
+            headers=HEADERS,
+            timeout=aiohttp.ClientTimeout(total=10),
+            connector=aiohttp.TCPConnector(limit=32),
+        )
+    return _HTTP
+
+def _ddg_search(query, max_results):
+    with DDGS() as ddgs:
+        return list(ddgs.text(query, max_results=max_results))
+
+def _extract_text(body):
+    """Parse HTML and return cleaned, truncated page text (CPU-bound)."""
+    soup = BeautifulSoup(body, 'lxml', parse_only=BODY_STRAINER)
+
+    # Remove scripts and styles
+    for script in soup(["script", "style", "nav", "footer", "header"]):
+        script.extract()
+
+    text = soup.get_text()
+
+    # Cut the raw text before cleanup so huge pages don't pay for it;
+    # the margin leaves room for whitespace to collapse
+    truncated = len(text) > RAW_TEXT_CHARS
+    if truncated:
+        text = text[:RAW_TEXT_CHARS]
+
+    # Clean whitespace
+    text = _NL.sub('\n', _WS.sub(' ', text)).strip()
+
+    # Truncate if too long (approx 10k chars)
+    if truncated or len(text) > MAX_TEXT_CHARS:
+        text = text[:MAX_TEXT_CHARS] + "\n...[truncated]..."
+    return text
 
 @mcp.tool()
-def web_search(query: str, max_results: int = 5) -> str:
+async def web_search(query: str, max_results: int = 5) -> str:
     """Search the web for information using DuckDuckGo.
     Use this when you need current information, news, or answers not in your training data.
     """
     try:
-        with DDGS() as ddgs:
-            results = list(ddgs.text(query, max_results=max_results))
-            
+        # DDGS is synchronous; keep it off the event loop
+        results = await asyncio.to_thread(_ddg_search, query, max_results)
+
         if not results:
             return "No results found."
-            
+
         formatted = []
         for r in results:
             formatted.append(f"Title: {r['title']}\nLink: {r['href']}\nSnippet: {r['body']}\n")
-            
+
         return "\n".join(formatted)
     except Exception as e:
         return f"Search error: {str(e)}"
 
 @mcp.tool()
-def read_webpage(url: str) -> str:
+async def read_webpage(url: str) -> str:
     """Read the content of a specific webpage URL.
     Use this to get details from a search result.
     """
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-        }
-        resp = requests.get(url, headers=headers, timeout=10)
-        resp.raise_for_status()
-        
-        soup = BeautifulSoup(resp.content, 'html.parser')
-        
-        # Remove scripts and styles
-        for script in soup(["script", "style", "nav", "footer", "header"]):
-            script.extract()
-            
-        text = soup.get_text()
-        
-        # Clean whitespace
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = '\n'.join(chunk for chunk in chunks if chunk)
-        
-        # Truncate if too long (approx 10k chars)
-        if len(text) > 10000:
-            text = text[:10000] + "\n...[truncated]..."
-            
+        async with _http().get(url) as resp:
+            resp.raise_for_status()
+            # Never pull more than MAX_PAGE_BYTES of a page into memory
+            chunks = []
+            size = 0
+            async for chunk in resp.content.iter_chunked(65536):
+                chunks.append(chunk)
+                size += len(chunk)
+                if size >= MAX_PAGE_BYTES:
+                    break
+        body = b"".join(chunks)[:MAX_PAGE_BYTES]
+
+        text = await asyncio.to_thread(_extract_text, body)
+
         return f"Source: {url}\n\n{text}"
     except Exception as e:
         return f"Failed to read page: {str(e)}"
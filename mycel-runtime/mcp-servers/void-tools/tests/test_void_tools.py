@@ -0,0 +1,182 @@
+"""Tests for the void-tools MCP server."""
+
+import asyncio
+import os
+
+import pytest
+
+import void_tools
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def text(result):
+    return result.content[0].text
+
+
+# --- xbps_list_installed ---
+
+@pytest.fixture
+def fake_xbps(monkeypatch):
+    """Pretend to be on xbps with a fixed installed-package list."""
+    calls = []
+
+    async def run_command_head(cmd, max_lines, timeout=30, sep=b"\n"):
+        calls.append((cmd, max_lines))
+        lines = ["ii bash-5.2_1", "ii curl-8.5_1", "ii zsh-5.9_1"]
+        return lines[:max_lines], len(lines) > max_lines, "", 0
+
+    monkeypatch.setattr(void_tools, "HAS_XBPS", True)
+    monkeypatch.setattr(void_tools, "run_command_head", run_command_head)
+    return calls
+
+
+@pytest.mark.parametrize("limit", [0, -5])
+def test_list_installed_rejects_limit_below_one(fake_xbps, limit):
+    result = run(void_tools.xbps_list_installed(None, limit, cache=False))
+    assert result.isError
+    assert "limit" in text(result)
+    assert fake_xbps == []
+
+
+def test_list_installed_limit_one(fake_xbps):
+    result = run(void_tools.xbps_list_installed(None, 1, cache=False))
+    assert not result.isError
+    assert text(result).startswith("ii bash-5.2_1")
+    assert "showing first 1 packages" in text(result)
+    assert fake_xbps == [(["xbps-query", "-l"], 1)]
+
+
+# --- runit_status ---
+
+NOW = 1_700_000_000
+
+
+def status_record(state, pid=0, since=NOW - 42, paused=0, want=b"u", term=0):
+    """A supervise/status record as runsv writes it."""
+    return (
+        (since + void_tools.TAI64_UNIX_OFFSET).to_bytes(8, "big")
+        + bytes(4)
+        + pid.to_bytes(4, "little")
+        + bytes([paused]) + want + bytes([term, state])
+    )
+
+
+@pytest.fixture
+def service_dir(tmp_path, monkeypatch):
+    """A fake /var/service; make_service() lays out one supervised service."""
+    monkeypatch.setattr(void_tools, "RUNIT_SERVICE_DIR", str(tmp_path))
+    monkeypatch.setattr(void_tools.time, "time", lambda: NOW)
+    readers = []
+
+    def make_service(path, record, runsv_alive=True, down=False):
+        supervise = path / "supervise"
+        supervise.mkdir(parents=True)
+        (supervise / "status").write_bytes(record)
+        os.mkfifo(supervise / "ok")
+        if runsv_alive:
+            # runsv holds supervise/ok open for reading
+            readers.append(os.open(supervise / "ok", os.O_RDONLY | os.O_NONBLOCK))
+        if down:
+            (path / "down").touch()
+        return path
+
+    yield make_service
+    for fd in readers:
+        os.close(fd)
+
+
+def test_runit_status_running(service_dir, tmp_path):
+    service_dir(tmp_path / "sshd", status_record(1, pid=123))
+    assert void_tools.runit_status("sshd") == "run: sshd: (pid 123) 42s"
+
+
+def test_runit_status_down(service_dir, tmp_path):
+    service_dir(tmp_path / "sshd", status_record(0, want=b"d"))
+    assert void_tools.runit_status("sshd") == "down: sshd: 42s, normally up"
+
+
+def test_runit_status_flags(service_dir, tmp_path):
+    service_dir(
+        tmp_path / "sshd",
+        status_record(1, pid=7, paused=1, want=b"d", term=1),
+        down=True,
+    )
+    assert void_tools.runit_status("sshd") == (
+        "run: sshd: (pid 7) 42s, normally down, paused, want down, got TERM"
+    )
+
+
+def test_runit_status_runsv_not_running(service_dir, tmp_path):
+    # A dead runsv leaves its last record behind; it must not read as "run"
+    service_dir(tmp_path / "sshd", status_record(1, pid=123), runsv_alive=False)
+    assert void_tools.runit_status("sshd") == "fail: sshd: runsv not running"
+
+
+def test_runit_status_includes_log_service(service_dir, tmp_path):
+    service = service_dir(tmp_path / "sshd", status_record(1, pid=123))
+    service_dir(service / "log", status_record(1, pid=124, since=NOW - 40))
+    assert void_tools.runit_status("sshd") == (
+        "run: sshd: (pid 123) 42s; run: log: (pid 124) 40s"
+    )
+
+
+def test_runit_status_unreadable_falls_back(service_dir, tmp_path):
+    (tmp_path / "sshd").mkdir()
+    assert void_tools.runit_status("sshd") is None
+
+
+# --- C library detection ---
+
+def test_elf_interpreter_of_non_elf(tmp_path):
+    script = tmp_path / "script"
+    script.write_bytes(b"#!/bin/sh\necho hi\n")
+    assert void_tools._elf_interpreter(str(script)) is None
+
+
+@pytest.mark.parametrize("interp, libc", [
+    (b"/lib/ld-musl-x86_64.so.1", "musl"),
+    (b"/lib64/ld-linux-x86-64.so.2", "glibc"),
+])
+def test_libc_from_host_uses_shell_loader(monkeypatch, interp, libc):
+    monkeypatch.setattr(void_tools, "_elf_interpreter", lambda path: interp)
+    assert void_tools._libc_from_host() == libc
+
+
+def test_detect_libc_prefers_host_over_interpreter(monkeypatch):
+    # A glibc Python on a musl host must still report musl
+    monkeypatch.setattr(void_tools, "_elf_interpreter", lambda path: b"/lib/ld-musl-aarch64.so.1")
+    monkeypatch.setattr(void_tools, "_libc_from_process", lambda: "glibc")
+    assert run(void_tools._detect_libc()) == "musl"
+
+
+# --- shell_command ---
+
+def test_shell_command_timeout_kills_grandchildren(tmp_path):
+    # Exec'd directly (no shell syntax), yet its forked worker must die too
+    pidfile = tmp_path / "pid"
+    script = tmp_path / "forker.py"
+    script.write_text(
+        "import subprocess, sys, time\n"
+        "p = subprocess.Popen(['sleep', '60'])\n"
+        f"open({str(pidfile)!r}, 'w').write(str(p.pid))\n"
+        "time.sleep(60)\n"
+    )
+    result = run(void_tools.shell_command(f"python3 {script}", timeout=1))
+    assert result.isError
+    assert "timed out" in text(result)
+
+    pid = int(pidfile.read_text())
+    deadline = void_tools.time.monotonic() + 5
+    while void_tools.time.monotonic() < deadline:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                if f.read().split(") ", 1)[1].startswith("Z"):
+                    break  # killed, waiting to be reaped by init
+        except FileNotFoundError:
+            break
+        void_tools.time.sleep(0.05)
+    else:
+        pytest.fail("grandchild survived the timeout")
@@ -11,11 +11,22 @@ Falls back gracefully when not running on Void Linux (for development).
 """
 
 import asyncio
+import contextvars
+import errno
+import fnmatch
+import functools
+import glob
+import itertools
+import json
 import os
-import shutil
-import subprocess
+import re
+import signal
+import stat
+import struct
 import sys
-from typing import Any
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, NamedTuple
 
 # MCP imports - using the official SDK
 try:
@@ -31,51 +42,331 @@ except ImportError:
     sys.exit(1)
 
 
+def _ok(text: str) -> CallToolResult:
+    """Successful text result.
+
+    Built with model_construct: the fields are known-good, so skip pydantic
+    validation on every response.
+    """
+    return CallToolResult.model_construct(
+        content=[TextContent.model_construct(type="text", text=text)],
+        isError=False,
+    )
+
+
+def _err(text: str) -> CallToolResult:
+    """Error text result (see _ok)."""
+    return CallToolResult.model_construct(
+        content=[TextContent.model_construct(type="text", text=text)],
+        isError=True,
+    )
+
+
+@functools.cache
+def os_release() -> bytes:
+    """Raw /etc/os-release, read at most once per process."""
+    try:
+        with open("/etc/os-release", "rb") as f:
+            return f.read(4096)
+    except OSError:
+        return b""
+
+
+@functools.cache
 def is_void_linux() -> bool:
     """Check if running on Void Linux."""
+    return b"Void" in os_release()
+
+
+async def with_timeout(aw: Awaitable[Any], timeout: float) -> Any:
+    """Await `aw` under a deadline, raising asyncio.TimeoutError on expiry.
+
+    Uses asyncio.timeout() where available (3.11+), which scopes the
+    deadline without wrapping `aw` in an extra Task; falls back to wait_for.
+    """
+    if sys.version_info >= (3, 11):
+        async with asyncio.timeout(timeout):
+            return await aw
+    return await asyncio.wait_for(aw, timeout)
+
+
+async def read_capped(stream: asyncio.StreamReader, limit: int) -> bytes:
+    """Read `stream` to EOF, keeping only its first `limit` bytes.
+
+    The rest is drained and dropped, so a very chatty command can't grow
+    the server's memory, yet still runs to completion without blocking
+    on a full pipe.
+    """
+    buf = bytearray()
+    while chunk := await stream.read(65536):
+        if len(buf) < limit:
+            buf += chunk[:limit - len(buf)]
+    return bytes(buf)
+
+
+async def kill_and_reap(
+    proc: asyncio.subprocess.Process,
+    stderr_reader: Awaitable[Any] | None = None,
+    group: bool = False,
+) -> None:
+    """Kill `proc` and wait for it, draining whatever is left in its pipes.
+
+    wait() only resolves once stdout and stderr have reached EOF, and a
+    pipe nobody reads any more stays full and never gets there. Pass
+    `stderr_reader` when a read of stderr is already in flight, and
+    `group` when `proc` leads its own process group (sh -c pipelines) so
+    its children go too. The drain is bounded in case something outside
+    the group still holds a pipe.
+    """
+    if group:
+        try:
+            os.killpg(proc.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+    proc.kill()
+    if stderr_reader is None:
+        stderr_reader = read_capped(proc.stderr, 0)
     try:
-        with open("/etc/os-release") as f:
-            content = f.read()
-            return "Void" in content
-    except FileNotFoundError:
-        return False
+        await with_timeout(asyncio.gather(
+            read_capped(proc.stdout, 0), stderr_reader, proc.wait(),
+        ), 5)
+    except asyncio.TimeoutError:
+        pass
 
 
-def run_command(cmd: list[str], timeout: int = 30) -> tuple[str, str, int]:
-    """Run a command and return (stdout, stderr, returncode)."""
+async def run_command(cmd: list[str], timeout: int = 30) -> tuple[str, str, int]:
+    """Run a command and return (stdout, stderr, returncode).
+
+    Runs without blocking the event loop, so other tool calls keep being
+    served while a slow query is in flight.
+    """
     try:
-        result = subprocess.run(
-            cmd,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
         )
-        return result.stdout, result.stderr, result.returncode
-    except subprocess.TimeoutExpired:
-        return "", "Command timed out", 124
     except FileNotFoundError:
         return "", f"Command not found: {cmd[0]}", 127
 
+    try:
+        stdout, stderr = await with_timeout(proc.communicate(), timeout)
+    except asyncio.TimeoutError:
+        # Reap the child so it doesn't linger as a zombie
+        await kill_and_reap(proc)
+        return "", "Command timed out", 124
+    except asyncio.CancelledError:
+        # An enclosing deadline expired; don't leave the child running
+        proc.kill()
+        raise
+
+    return (
+        stdout.decode(errors="replace"),
+        stderr.decode(errors="replace"),
+        proc.returncode,
+    )
+
+
+ENV_CACHE_FILE = os.path.expanduser("~/.cache/mycel/void_tools_env.json")
+
+
+def _env_fingerprint() -> list[list]:
+    """mtimes of everything environment detection depends on.
+
+    Installing or removing a binary changes the mtime of its PATH directory,
+    so a matching fingerprint means the cached detection is still valid.
+    """
+    paths = ["/etc/os-release", "/run/runit", *os.environ.get("PATH", "").split(os.pathsep)]
+    fingerprint = []
+    for path in paths:
+        try:
+            fingerprint.append([path, os.stat(path).st_mtime_ns])
+        except OSError:
+            fingerprint.append([path, None])
+    return fingerprint
+
+
+def find_executables(*names: str) -> frozenset[str]:
+    """Which of `names` are executables on $PATH, in one pass over PATH.
+
+    Equivalent to calling shutil.which() per name, without re-splitting and
+    re-walking PATH for each of them.
+    """
+    wanted = set(names)
+    found = set()
+    for directory in os.environ.get("PATH", os.defpath).split(os.pathsep):
+        for name in wanted - found:
+            candidate = os.path.join(directory or os.curdir, name)
+            if os.access(candidate, os.X_OK) and not os.path.isdir(candidate):
+                found.add(name)
+        if found == wanted:
+            break
+    return frozenset(found)
+
+
+class Environment(NamedTuple):
+    """What the host provides: OS, package manager and init system."""
+    is_void: bool
+    has_xbps: bool
+    has_apt: bool
+    has_runit: bool
+    has_systemd: bool
+
+
+def detect_environment() -> Environment:
+    """Probe the OS, package manager and init system."""
+    execs = find_executables("xbps-query", "apt-cache", "sv", "systemctl")
+    return Environment(
+        is_void=is_void_linux(),
+        has_xbps="xbps-query" in execs,
+        has_apt="apt-cache" in execs,
+        has_runit=os.path.exists("/run/runit") or "sv" in execs,
+        has_systemd="systemctl" in execs,
+    )
+
+
+@functools.cache
+def load_environment() -> Environment:
+    """Return environment flags, reusing the on-disk result when still valid."""
+    fingerprint = _env_fingerprint()
+    try:
+        with open(ENV_CACHE_FILE) as f:
+            cached = json.load(f)
+        if cached["fingerprint"] == fingerprint:
+            return Environment(**cached["env"])
+    except (OSError, ValueError, KeyError, TypeError):
+        # TypeError: written with a different set of fields
+        pass
+
+    env = detect_environment()
+    try:
+        os.makedirs(os.path.dirname(ENV_CACHE_FILE), exist_ok=True)
+        tmp = f"{ENV_CACHE_FILE}.{os.getpid()}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"fingerprint": fingerprint, "env": env._asdict()}, f)
+        os.replace(tmp, ENV_CACHE_FILE)
+    except OSError:
+        pass
+    return env
+
+
+async def run_command_head(
+    cmd: list[str], max_lines: int, timeout: int = 30, sep: bytes = b"\n"
+) -> tuple[list[str], bool, str, int]:
+    """Run a command, keeping at most `max_lines` lines of stdout.
+
+    Returns (lines, truncated, stderr, returncode). Once more output than
+    `max_lines` is seen the child is terminated and truncated is True.
+    `sep` is the record terminator, e.g. b"\0" for find -print0/grep -Z.
+    """
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+    except FileNotFoundError:
+        return [], False, f"Command not found: {cmd[0]}", 127
+
+    lines: list[str] = []
+
+    async def read_lines() -> bool:
+        pending = b""
+        while True:
+            try:
+                raw = pending + await proc.stdout.readuntil(sep)
+            except asyncio.LimitOverrunError as e:
+                # A record longer than the stream's buffer limit; take what
+                # is buffered and keep looking for its terminator
+                pending += await proc.stdout.readexactly(e.consumed)
+                continue
+            except asyncio.IncompleteReadError as e:
+                # Last record without a terminator, or EOF
+                raw = pending + e.partial
+                if not raw:
+                    return False
+            pending = b""
+            if len(lines) >= max_lines:
+                return True
+            lines.append(raw.rstrip(sep).decode(errors="replace"))
+
+    # Read stderr alongside stdout: a child blocked on a full stderr pipe
+    # (find over an unreadable tree) would otherwise never finish stdout
+    stderr_task = asyncio.ensure_future(proc.stderr.read())
+    try:
+        truncated = await with_timeout(read_lines(), timeout)
+    except asyncio.TimeoutError:
+        await kill_and_reap(proc, stderr_task)
+        return [], False, "Command timed out", 124
+    except asyncio.CancelledError:
+        proc.kill()
+        stderr_task.cancel()
+        raise
+
+    if truncated:
+        # The rest of the output is unwanted; the child may never stop on
+        # its own, and its pipes must be drained before it can be reaped
+        await kill_and_reap(proc, stderr_task)
+        return lines, True, "", 0
+
+    stderr = await stderr_task
+    await proc.wait()
+    return lines, False, stderr.decode(errors="replace"), proc.returncode
+
 
 # Detect environment
-IS_VOID = is_void_linux()
-HAS_XBPS = shutil.which("xbps-query") is not None
-HAS_APT = shutil.which("apt-cache") is not None
-HAS_RUNIT = os.path.exists("/run/runit") or shutil.which("sv") is not None
-HAS_SYSTEMD = shutil.which("systemctl") is not None
+IS_VOID, HAS_XBPS, HAS_APT, HAS_RUNIT, HAS_SYSTEMD = load_environment()
+
+
+# Upper bound on concurrent `sv status` children spawned by service_list
+SERVICE_STATUS_CONCURRENCY = 16
+
+# Enabled runit services, and the offset from runit's TAI64 timestamps
+# (2^62 + 10 leap seconds) to the Unix epoch
+RUNIT_SERVICE_DIR = "/var/service"
+TAI64_UNIX_OFFSET = 4611686018427387914
+
+# Overall time budget for all of system_info's probes together
+SYSTEM_INFO_TIMEOUT = 10
+
+# Most characters file_read returns; reads stop just past this
+MAX_READ_CHARS = 50000
+
+# Most characters of combined stdout/stderr shell_command returns
+MAX_SHELL_OUTPUT = 10000
+
+# Characters that give a command line shell semantics (quoting, expansion,
+# redirection, pipelines, assignments, comments); without any of them the
+# command is just argv split on whitespace
+SHELL_SYNTAX_CHARS = frozenset("|&;<>()$`\\\"'*?[]{}~#=%!\n")
+
+# Command substrings shell_command refuses to run, matched in one scan
+DANGEROUS_COMMAND_RE = re.compile("|".join(map(re.escape, [
+    "rm -rf /",
+    "mkfs",
+    ":(){:|:&};:",
+    "dd if=/dev/zero of=/dev/",
+])))
 
 
 # Create MCP server
 server = Server("void-tools")
 
 
-@server.list_tools()
-async def list_tools() -> list[Tool]:
-    """Return list of available tools."""
-    tools = []
+# Schema properties shared by several tools, defined once and referenced
+CACHE_PROPERTY = {
+    "type": "boolean",
+    "description": "Reuse a recent cached result if available (default: true)"
+}
+SERVICE_PROPERTY = {
+    "type": "string",
+    "description": "Service name"
+}
 
+# Tool schemas are static, so build them once at import time
+TOOLS: list[Tool] = [
     # Shell command tool - the most useful for an OS assistant
-    tools.append(Tool(
+    Tool(
         name="shell_command",
         description="Execute a shell command and return the output. Use for: listing files, checking status, running scripts, etc.",
         inputSchema={
@@ -96,10 +387,10 @@ async def list_tools() -> list[Tool]:
             },
             "required": ["command"]
         }
-    ))
+    ),
 
     # File read tool
-    tools.append(Tool(
+    Tool(
         name="file_read",
         description="Read the contents of a file. Returns the text content.",
         inputSchema={
@@ -116,10 +407,10 @@ async def list_tools() -> list[Tool]:
             },
             "required": ["path"]
         }
-    ))
+    ),
 
     # File write tool
-    tools.append(Tool(
+    Tool(
         name="file_write",
         description="Write content to a file. Creates the file if it doesn't exist.",
         inputSchema={
@@ -140,10 +431,10 @@ async def list_tools() -> list[Tool]:
             },
             "required": ["path", "content"]
         }
-    ))
+    ),
 
     # File list tool
-    tools.append(Tool(
+    Tool(
         name="file_list",
         description="List files in a directory with details.",
         inputSchema={
@@ -164,10 +455,10 @@ async def list_tools() -> list[Tool]:
             },
             "required": []
         }
-    ))
+    ),
 
     # File search tool
-    tools.append(Tool(
+    Tool(
         name="file_search",
         description="Search for files by name or content.",
         inputSchema={
@@ -188,10 +479,10 @@ async def list_tools() -> list[Tool]:
             },
             "required": ["path"]
         }
-    ))
+    ),
 
     # Package search tool
-    tools.append(Tool(
+    Tool(
         name="xbps_search",
         description="Search for packages in the repository. On Void Linux uses xbps-query, falls back to apt-cache on Debian/Ubuntu.",
         inputSchema={
@@ -200,14 +491,15 @@ async def list_tools() -> list[Tool]:
                 "query": {
                     "type": "string",
                     "description": "Search query (package name or description)"
-                }
+                },
+                "cache": CACHE_PROPERTY
             },
             "required": ["query"]
         }
-    ))
+    ),
 
     # Package info tool
-    tools.append(Tool(
+    Tool(
         name="xbps_info",
         description="Get detailed information about a package. Shows version, description, dependencies, etc.",
         inputSchema={
@@ -216,14 +508,15 @@ async def list_tools() -> list[Tool]:
                 "package": {
                     "type": "string",
                     "description": "Package name to get info about"
-                }
+                },
+                "cache": CACHE_PROPERTY
             },
             "required": ["package"]
         }
-    ))
+    ),
 
     # Package install tool (requires confirmation)
-    tools.append(Tool(
+    Tool(
         name="xbps_install",
         description="Install a package. REQUIRES USER CONFIRMATION. On Void uses xbps-install, falls back to apt on Debian/Ubuntu.",
         inputSchema={
@@ -236,35 +529,29 @@ async def list_tools() -> list[Tool]:
             },
             "required": ["package"]
         }
-    ))
+    ),
 
     # Service status tool
-    tools.append(Tool(
+    Tool(
         name="service_status",
         description="Get the status of a system service. On Void uses sv, falls back to systemctl on systemd systems.",
         inputSchema={
             "type": "object",
             "properties": {
-                "service": {
-                    "type": "string",
-                    "description": "Service name"
-                }
+                "service": SERVICE_PROPERTY
             },
             "required": ["service"]
         }
-    ))
+    ),
 
     # Service control tool (requires confirmation)
-    tools.append(Tool(
+    Tool(
         name="service_control",
         description="Control a system service (start/stop/restart). REQUIRES USER CONFIRMATION.",
         inputSchema={
             "type": "object",
             "properties": {
-                "service": {
-                    "type": "string",
-                    "description": "Service name"
-                },
+                "service": SERVICE_PROPERTY,
                 "action": {
                     "type": "string",
                     "enum": ["up", "down", "restart"],
@@ -273,10 +560,10 @@ async def list_tools() -> list[Tool]:
             },
             "required": ["service", "action"]
         }
-    ))
+    ),
 
     # System info tool
-    tools.append(Tool(
+    Tool(
         name="system_info",
         description="Get system information: OS details, kernel version, CPU, memory, etc.",
         inputSchema={
@@ -284,10 +571,10 @@ async def list_tools() -> list[Tool]:
             "properties": {},
             "required": []
         }
-    ))
+    ),
 
     # Package remove tool (requires confirmation)
-    tools.append(Tool(
+    Tool(
         name="xbps_remove",
         description="Remove an installed package. REQUIRES USER CONFIRMATION. On Void uses xbps-remove, falls back to apt on Debian/Ubuntu.",
         inputSchema={
@@ -304,10 +591,10 @@ async def list_tools() -> list[Tool]:
             },
             "required": ["package"]
         }
-    ))
+    ),
 
     # List installed packages tool
-    tools.append(Tool(
+    Tool(
         name="xbps_list_installed",
         description="List installed packages, optionally filtered by a pattern.",
         inputSchema={
@@ -319,15 +606,17 @@ async def list_tools() -> list[Tool]:
                 },
                 "limit": {
                     "type": "integer",
+                    "minimum": 1,
                     "description": "Maximum number of packages to return (default: 50)"
-                }
+                },
+                "cache": CACHE_PROPERTY
             },
             "required": []
         }
-    ))
+    ),
 
     # List services tool
-    tools.append(Tool(
+    Tool(
         name="service_list",
         description="List all available services and their current status.",
         inputSchema={
@@ -335,7 +624,7 @@ async def list_tools() -> list[Tool]:
             "properties": {
                 "filter": {
                     "type": "string",
-                    "description": "Filter services by name pattern (optional)"
+                    "description": "Filter services by name substring or glob, case-insensitive (optional, e.g. 'net*')"
                 },
                 "running_only": {
                     "type": "boolean",
@@ -344,294 +633,342 @@ async def list_tools() -> list[Tool]:
             },
             "required": []
         }
-    ))
+    ),
+]
 
-    return tools
 
+@server.list_tools()
+async def list_tools() -> list[Tool]:
+    """Return list of available tools."""
+    return TOOLS
 
-@server.call_tool()
-async def call_tool(name: str, arguments: dict[str, Any]) -> CallToolResult:
-    """Handle tool calls."""
 
+# Tool name -> adapter from MCP arguments to the handler coroutine
+TOOL_HANDLERS: dict[str, Callable[[dict[str, Any]], Awaitable[CallToolResult]]] = {
     # Core shell/file tools (most useful)
-    if name == "shell_command":
-        return await shell_command(
-            arguments.get("command", ""),
-            arguments.get("cwd"),
-            arguments.get("timeout", 30)
-        )
-    elif name == "file_read":
-        return await file_read(
-            arguments.get("path", ""),
-            arguments.get("lines")
-        )
-    elif name == "file_write":
-        return await file_write(
-            arguments.get("path", ""),
-            arguments.get("content", ""),
-            arguments.get("append", False)
-        )
-    elif name == "file_list":
-        return await file_list(
-            arguments.get("path", "."),
-            arguments.get("pattern"),
-            arguments.get("recursive", False)
-        )
-    elif name == "file_search":
-        return await file_search(
-            arguments.get("path", "."),
-            arguments.get("name"),
-            arguments.get("content")
-        )
+    "shell_command": lambda a: shell_command(
+        a.get("command", ""),
+        a.get("cwd"),
+        a.get("timeout", 30)
+    ),
+    "file_read": lambda a: file_read(
+        a.get("path", ""),
+        a.get("lines")
+    ),
+    "file_write": lambda a: file_write(
+        a.get("path", ""),
+        a.get("content", ""),
+        a.get("append", False)
+    ),
+    "file_list": lambda a: file_list(
+        a.get("path", "."),
+        a.get("pattern"),
+        a.get("recursive", False)
+    ),
+    "file_search": lambda a: file_search(
+        a.get("path", "."),
+        a.get("name"),
+        a.get("content")
+    ),
     # Package management tools
-    elif name == "xbps_search":
-        return await xbps_search(arguments.get("query", ""))
-    elif name == "xbps_info":
-        return await xbps_info(arguments.get("package", ""))
-    elif name == "xbps_install":
-        return await xbps_install(arguments.get("package", ""))
-    elif name == "service_status":
-        return await service_status(arguments.get("service", ""))
-    elif name == "service_control":
-        return await service_control(
-            arguments.get("service", ""),
-            arguments.get("action", "status")
-        )
-    elif name == "system_info":
-        return await system_info()
-    elif name == "xbps_remove":
-        return await xbps_remove(
-            arguments.get("package", ""),
-            arguments.get("recursive", False)
-        )
-    elif name == "xbps_list_installed":
-        return await xbps_list_installed(
-            arguments.get("pattern"),
-            arguments.get("limit", 50)
-        )
-    elif name == "service_list":
-        return await service_list(
-            arguments.get("filter"),
-            arguments.get("running_only", False)
-        )
-    else:
-        return CallToolResult(
-            content=[TextContent(type="text", text=f"Unknown tool: {name}")],
-            isError=True
-        )
+    "xbps_search": lambda a: xbps_search(
+        a.get("query", ""),
+        cache=a.get("cache", True)
+    ),
+    "xbps_info": lambda a: xbps_info(
+        a.get("package", ""),
+        cache=a.get("cache", True)
+    ),
+    "xbps_install": lambda a: xbps_install(a.get("package", "")),
+    "service_status": lambda a: service_status(a.get("service", "")),
+    "service_control": lambda a: service_control(
+        a.get("service", ""),
+        a.get("action", "status")
+    ),
+    "system_info": lambda a: system_info(),
+    "xbps_remove": lambda a: xbps_remove(
+        a.get("package", ""),
+        a.get("recursive", False)
+    ),
+    "xbps_list_installed": lambda a: xbps_list_installed(
+        a.get("pattern"),
+        a.get("limit", 50),
+        cache=a.get("cache", True)
+    ),
+    "service_list": lambda a: service_list(
+        a.get("filter"),
+        a.get("running_only", False)
+    ),
+}
+
+
+@server.call_tool()
+async def call_tool(name: str, arguments: dict[str, Any]) -> CallToolResult:
+    """Handle tool calls."""
+    handler = TOOL_HANDLERS.get(name)
+    if handler is None:
+        return _err(f"Unknown tool: {name}")
+    # Tools without parameters may be called with no arguments object at all
+    return await handler(arguments or {})
 
 
 # ============================================================================
 # CORE TOOLS - Shell & File Operations
 # ============================================================================
 
+async def spawn_shell_command(command: str, cwd: str | None) -> asyncio.subprocess.Process:
+    """Start `command`, skipping /bin/sh when the shell would add nothing.
+
+    Commands free of shell syntax (e.g. "ls -la", "df -h") are plain
+    whitespace-separated argv, so they are exec'd directly. Anything else,
+    or a name with no executable (a shell builtin), goes through the shell.
+    """
+    # Either way the command gets its own session, so a timeout can kill
+    # everything it started (a pipeline, make's jobs), not just its leader
+    argv = command.split() if SHELL_SYNTAX_CHARS.isdisjoint(command) else None
+    if argv:
+        try:
+            return await asyncio.create_subprocess_exec(
+                *argv,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=cwd,
+                start_new_session=True,
+            )
+        except (FileNotFoundError, PermissionError):
+            pass
+    return await asyncio.create_subprocess_shell(
+        command,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        cwd=cwd,
+        start_new_session=True,
+    )
+
+
 async def shell_command(command: str, cwd: str | None = None, timeout: int = 30) -> CallToolResult:
     """Execute a shell command."""
     if not command:
-        return CallToolResult(
-            content=[TextContent(type="text", text="Error: command is required")],
-            isError=True
-        )
+        return _err("Error: command is required")
 
     # Security: block obviously dangerous commands
-    dangerous = ["rm -rf /", "mkfs", ":(){:|:&};:", "dd if=/dev/zero of=/dev/"]
-    for d in dangerous:
-        if d in command:
-            return CallToolResult(
-                content=[TextContent(type="text", text=f"Error: Blocked dangerous command pattern: {d}")],
-                isError=True
-            )
+    blocked = DANGEROUS_COMMAND_RE.search(command)
+    if blocked:
+        return _err(f"Error: Blocked dangerous command pattern: {blocked.group(0)}")
 
     try:
-        result = subprocess.run(
-            command,
-            shell=True,
-            capture_output=True,
-            text=True,
-            timeout=timeout,
-            cwd=cwd
-        )
-
-        output = ""
-        if result.stdout:
-            output += result.stdout
-        if result.stderr:
-            if output:
-                output += "\n--- stderr ---\n"
-            output += result.stderr
+        # Run without blocking the event loop so other tool calls are served
+        # while a long command is in flight
+        proc = await spawn_shell_command(command, cwd)
+        try:
+            # Keep one byte past the limit so truncation is still detected
+            stdout_b, stderr_b, _ = await with_timeout(asyncio.gather(
+                read_capped(proc.stdout, MAX_SHELL_OUTPUT + 1),
+                read_capped(proc.stderr, MAX_SHELL_OUTPUT + 1),
+                proc.wait(),
+            ), timeout)
+        except asyncio.TimeoutError:
+            # The readers were cancelled with the deadline; kill_and_reap() drains
+            # the pipes again so wait() can see EOF
+            await kill_and_reap(proc, group=True)
+            return _err(f"Error: Command timed out after {timeout}s")
+        except asyncio.CancelledError:
+            proc.kill()
+            raise
+        # Only the first MAX_SHELL_OUTPUT characters are returned, so only
+        # decode that much of each stream (a char is at least one byte)
+        truncated = len(stdout_b) > MAX_SHELL_OUTPUT or len(stderr_b) > MAX_SHELL_OUTPUT
+        stdout = stdout_b[:MAX_SHELL_OUTPUT].decode(errors="replace")
+        stderr = stderr_b[:MAX_SHELL_OUTPUT].decode(errors="replace")
+
+        parts = []
+        if stdout:
+            parts.append(stdout)
+        if stderr:
+            if parts:
+                parts.append("\n--- stderr ---\n")
+            parts.append(stderr)
+        output = "".join(parts)
 
         if not output.strip():
             output = "(no output)"
 
         # Limit output size
-        if len(output) > 10000:
-            output = output[:10000] + "\n... (output truncated)"
+        if truncated or len(output) > MAX_SHELL_OUTPUT:
+            output = output[:MAX_SHELL_OUTPUT] + "\n... (output truncated)"
 
-        return CallToolResult(
-            content=[TextContent(type="text", text=output.strip())]
-        )
-    except subprocess.TimeoutExpired:
-        return CallToolResult(
-            content=[TextContent(type="text", text=f"Error: Command timed out after {timeout}s")],
-            isError=True
-        )
+        return _ok(output.strip())
     except Exception as e:
-        return CallToolResult(
-            content=[TextContent(type="text", text=f"Error: {str(e)}")],
-            isError=True
-        )
+        return _err(f"Error: {str(e)}")
+
+
+def _read_text(path: str, lines: int | None) -> str:
+    """Blocking half of file_read: checks and read in one thread hop."""
+    # One stat answers both "exists?" and "is it a directory?"
+    if stat.S_ISDIR(os.stat(path).st_mode):
+        raise IsADirectoryError(path)
+    with open(path, "r", errors="replace") as f:
+        if lines:
+            return "".join(itertools.islice(f, lines))
+        # One char past the cap is enough to know the file was truncated
+        return f.read(MAX_READ_CHARS + 1)
+
+
+def _write_text(path: str, content: str, append: bool) -> None:
+    """Blocking half of file_write."""
+    # Create parent directories if needed
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+
+    mode = "a" if append else "w"
+    with open(path, mode) as f:
+        f.write(content)
 
 
 async def file_read(path: str, lines: int | None = None) -> CallToolResult:
     """Read file contents."""
     if not path:
-        return CallToolResult(
-            content=[TextContent(type="text", text="Error: path is required")],
-            isError=True
-        )
+        return _err("Error: path is required")
 
     try:
         # Expand ~ and resolve path
         path = os.path.expanduser(path)
 
-        if not os.path.exists(path):
-            return CallToolResult(
-                content=[TextContent(type="text", text=f"Error: File not found: {path}")],
-                isError=True
-            )
-
-        if os.path.isdir(path):
-            return CallToolResult(
-                content=[TextContent(type="text", text=f"Error: '{path}' is a directory, not a file")],
-                isError=True
-            )
-
-        with open(path, "r", errors="replace") as f:
-            if lines:
-                content = "".join(f.readline() for _ in range(lines))
-            else:
-                content = f.read()
+        # Disk reads stay off the event loop
+        content = await asyncio.to_thread(_read_text, path, lines)
 
         # Limit output size
-        if len(content) > 50000:
-            content = content[:50000] + "\n... (file truncated, use 'lines' parameter to read specific sections)"
+        if len(content) > MAX_READ_CHARS:
+            content = content[:MAX_READ_CHARS] + "\n... (file truncated, use 'lines' parameter to read specific sections)"
 
-        return CallToolResult(
-            content=[TextContent(type="text", text=content if content else "(empty file)")]
-        )
+        return _ok(content if content else "(empty file)")
+    except FileNotFoundError:
+        return _err(f"Error: File not found: {path}")
+    except IsADirectoryError:
+        return _err(f"Error: '{path}' is a directory, not a file")
     except PermissionError:
-        return CallToolResult(
-            content=[TextContent(type="text", text=f"Error: Permission denied: {path}")],
-            isError=True
-        )
+        return _err(f"Error: Permission denied: {path}")
     except Exception as e:
-        return CallToolResult(
-            content=[TextContent(type="text", text=f"Error reading file: {str(e)}")],
-            isError=True
-        )
+        return _err(f"Error reading file: {str(e)}")
 
 
 async def file_write(path: str, content: str, append: bool = False) -> CallToolResult:
     """Write content to a file."""
     if not path:
-        return CallToolResult(
-            content=[TextContent(type="text", text="Error: path is required")],
-            isError=True
-        )
+        return _err("Error: path is required")
 
     try:
         path = os.path.expanduser(path)
 
-        # Create parent directories if needed
-        parent = os.path.dirname(path)
-        if parent and not os.path.exists(parent):
-            os.makedirs(parent)
-
-        mode = "a" if append else "w"
-        with open(path, mode) as f:
-            f.write(content)
+        await asyncio.to_thread(_write_text, path, content, append)
 
         action = "appended to" if append else "written to"
-        return CallToolResult(
-            content=[TextContent(type="text", text=f"Successfully {action} {path} ({len(content)} bytes)")]
-        )
+        return _ok(f"Successfully {action} {path} ({len(content)} bytes)")
     except PermissionError:
-        return CallToolResult(
-            content=[TextContent(type="text", text=f"Error: Permission denied: {path}")],
-            isError=True
-        )
+        return _err(f"Error: Permission denied: {path}")
     except Exception as e:
-        return CallToolResult(
-            content=[TextContent(type="text", text=f"Error writing file: {str(e)}")],
-            isError=True
-        )
+        return _err(f"Error writing file: {str(e)}")
 
 
-async def file_list(path: str = ".", pattern: str | None = None, recursive: bool = False) -> CallToolResult:
-    """List files in a directory."""
-    try:
-        path = os.path.expanduser(path)
+def _format_size(size: int) -> str:
+    """Human-readable size as shown by file_list ("?" if unknown)."""
+    if size < 0:
+        return "?"
+    if size > 1024 * 1024:
+        return f"{size / (1024*1024):.1f}M"
+    if size > 1024:
+        return f"{size / 1024:.1f}K"
+    return f"{size}B"
 
-        if not os.path.exists(path):
-            return CallToolResult(
-                content=[TextContent(type="text", text=f"Error: Path not found: {path}")],
-                isError=True
-            )
 
-        if not os.path.isdir(path):
-            return CallToolResult(
-                content=[TextContent(type="text", text=f"Error: '{path}' is not a directory")],
-                isError=True
-            )
+def _file_size(path: str) -> int:
+    """st_size of path, or -1 if it can't be stat'ed (e.g. broken symlink)."""
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return -1
+
+
+def _list_dir(path: str, pattern: str | None, recursive: bool) -> tuple[int, list[str]]:
+    """Blocking half of file_list: (number of matches, rows for the first 100).
+
+    Walks with scandir (directly or via os.walk), so entry types come from
+    the directory read and only the entries actually shown are stat'ed.
+    Matches what glob over path/pattern (or path/**/pattern) would return.
+    """
+    if not stat.S_ISDIR(os.stat(path).st_mode):
+        raise NotADirectoryError(path)
+
+    pattern = pattern or "*"
+    # Compiled once; fnmatch.fnmatch() would re-normalize and look up its
+    # pattern cache for every entry of the walk
+    matches = re.compile(fnmatch.translate(pattern)).match
+    # Like glob, hidden entries only match a pattern that starts with a dot
+    show_hidden = pattern.startswith(".")
+    # Matches as parallel columns: name relative to path, full path, is_dir
+    names, paths, is_dirs = [], [], []
+
+    if "/" in pattern:
+        # A pattern spanning directories (src/*.py) is matched against whole
+        # paths, not entry names; leave that to glob itself
+        search = os.path.join(path, "**", pattern) if recursive else os.path.join(path, pattern)
+        for full in glob.iglob(search, recursive=recursive):
+            names.append(os.path.relpath(full, path))
+            paths.append(full)
+            is_dirs.append(os.path.isdir(full))
+    elif recursive:
+        # glob's "**" follows symlinked directories too
+        for root, dirs, files in os.walk(path, followlinks=True):
+            for entries, is_dir in ((dirs, True), (files, False)):
+                for name in entries:
+                    if (show_hidden or name[0] != ".") and matches(name):
+                        full = os.path.join(root, name)
+                        names.append(os.path.relpath(full, path))
+                        paths.append(full)
+                        is_dirs.append(is_dir)
+            # Like "**", never descend into hidden directories
+            dirs[:] = [d for d in dirs if d[0] != "."]
+    else:
+        with os.scandir(path) as it:
+            for entry in it:
+                if (show_hidden or entry.name[0] != ".") and matches(entry.name):
+                    names.append(entry.name)
+                    paths.append(entry.path)
+                    is_dirs.append(entry.is_dir())
+
+    # Sort by name once and format only the first 100 entries
+    shown = sorted(range(len(names)), key=names.__getitem__)[:100]
+    sizes = [_file_size(paths[i]) for i in shown]
+    results = [
+        f"{_format_size(size):>8}  {names[i]}{'/' if is_dirs[i] else ''}"
+        for i, size in zip(shown, sizes)
+    ]
+    return len(names), results
 
-        import glob
 
-        if recursive:
-            search_pattern = os.path.join(path, "**", pattern or "*")
-            files = glob.glob(search_pattern, recursive=True)
-        else:
-            search_pattern = os.path.join(path, pattern or "*")
-            files = glob.glob(search_pattern)
+async def file_list(path: str = ".", pattern: str | None = None, recursive: bool = False) -> CallToolResult:
+    """List files in a directory."""
+    try:
+        path = os.path.expanduser(path)
 
-        if not files:
-            return CallToolResult(
-                content=[TextContent(type="text", text=f"No files found in {path}" + (f" matching '{pattern}'" if pattern else ""))]
-            )
+        try:
+            total, results = await asyncio.to_thread(_list_dir, path, pattern, recursive)
+        except FileNotFoundError:
+            return _err(f"Error: Path not found: {path}")
+        except NotADirectoryError:
+            return _err(f"Error: '{path}' is not a directory")
 
-        # Sort and format output
-        files.sort()
-
-        results = []
-        for f in files[:100]:  # Limit to 100 entries
-            try:
-                stat = os.stat(f)
-                size = stat.st_size
-                is_dir = os.path.isdir(f)
-                name = os.path.relpath(f, path)
-                if is_dir:
-                    name += "/"
-                if size > 1024 * 1024:
-                    size_str = f"{size / (1024*1024):.1f}M"
-                elif size > 1024:
-                    size_str = f"{size / 1024:.1f}K"
-                else:
-                    size_str = f"{size}B"
-                results.append(f"{size_str:>8}  {name}")
-            except:
-                results.append(f"{'?':>8}  {os.path.relpath(f, path)}")
+        if not total:
+            return _ok(f"No files found in {path}" + (f" matching '{pattern}'" if pattern else ""))
 
         output = "\n".join(results)
-        if len(files) > 100:
-            output += f"\n... and {len(files) - 100} more files"
+        if total > 100:
+            output += f"\n... and {total - 100} more files"
 
-        return CallToolResult(
-            content=[TextContent(type="text", text=output)]
-        )
+        return _ok(output)
     except Exception as e:
-        return CallToolResult(
-            content=[TextContent(type="text", text=f"Error listing files: {str(e)}")],
-            isError=True
-        )
+        return _err(f"Error listing files: {str(e)}")
 
 
 async def file_search(path: str, name: str | None = None, content: str | None = None) -> CallToolResult:
@@ -640,32 +977,27 @@ async def file_search(path: str, name: str | None = None, content: str | None =
         path = os.path.expanduser(path)
 
         if not os.path.exists(path):
-            return CallToolResult(
-                content=[TextContent(type="text", text=f"Error: Path not found: {path}")],
-                isError=True
-            )
+            return _err(f"Error: Path not found: {path}")
 
         if not name and not content:
-            return CallToolResult(
-                content=[TextContent(type="text", text="Error: Provide either 'name' pattern or 'content' to search for")],
-                isError=True
-            )
+            return _err("Error: Provide either 'name' pattern or 'content' to search for")
 
-        results = []
-
-        # Use find for name search, grep for content search
+        # Use find for name search, grep for content search. Paths are
+        # NUL-terminated so names containing newlines stay one result
         if name and not content:
-            cmd = ["find", path, "-name", name, "-type", "f"]
-            stdout, stderr, code = run_command(cmd, timeout=30)
-            if stdout.strip():
-                results = stdout.strip().split("\n")[:50]
-        elif content:
-            cmd = ["grep", "-rl", content, path]
+            cmd = ["find", path, "-name", name, "-type", "f", "-print0"]
+        else:
+            cmd = ["grep", "-rlZ", content, path]
             if name:
-                cmd = ["grep", "-rl", "--include", name, content, path]
-            stdout, stderr, code = run_command(cmd, timeout=30)
-            if stdout.strip():
-                results = stdout.strip().split("\n")[:50]
+                # One grep filtering names itself beats a concurrent find +
+                # full-tree grep intersected afterwards: non-matching files
+                # are never opened
+                cmd = ["grep", "-rlZ", "--include", name, content, path]
+
+        # Only 50 hits are shown: stop find/grep once they've produced them
+        # rather than letting them walk the rest of the tree
+        lines, _, _, _ = await run_command_head(cmd, 50, timeout=30, sep=b"\0")
+        results = [line for line in lines if line.strip()]
 
         if not results:
             msg = f"No files found"
@@ -673,106 +1005,239 @@ async def file_search(path: str, name: str | None = None, content: str | None =
                 msg += f" matching '{name}'"
             if content:
                 msg += f" containing '{content}'"
-            return CallToolResult(
-                content=[TextContent(type="text", text=msg)]
-            )
+            return _ok(msg)
 
-        return CallToolResult(
-            content=[TextContent(type="text", text="\n".join(results))]
-        )
+        return _ok("\n".join(results))
     except Exception as e:
-        return CallToolResult(
-            content=[TextContent(type="text", text=f"Error searching: {str(e)}")],
-            isError=True
-        )
+        return _err(f"Error searching: {str(e)}")
 
 
 # ============================================================================
 # PACKAGE MANAGEMENT TOOLS
 # ============================================================================
 
+# Repository contents change over minutes to hours, so read-only package
+# queries are answered from a small LRU cache for a few minutes
+_QUERY_CACHE: OrderedDict[tuple, tuple[float, tuple, CallToolResult]] = OrderedDict()
+_CACHE_TTL = 300.0
+_CACHE_MAX_ENTRIES = 256
+
+# Paths whose mtimes change when packages are installed/removed or the
+# repository index is synced; any change invalidates cached queries.
+# xbps keeps each repository's index in its own subdirectory of /var/db/xbps
+PACKAGE_STATE_PATHS = (
+    ["/var/db/xbps/pkgdb-0.38.plist"] if HAS_XBPS
+    else ["/var/lib/dpkg/status", "/var/lib/apt/lists"]
+)
+XBPS_REPO_INDEX_DIR = "/var/db/xbps"
+
+
+def package_state_stamp() -> tuple:
+    """mtimes of PACKAGE_STATE_PATHS and the xbps repository index dirs
+    (None for any that can't be stat'ed)."""
+    stamp = []
+    for path in PACKAGE_STATE_PATHS:
+        try:
+            stamp.append(os.stat(path).st_mtime_ns)
+        except OSError:
+            stamp.append(None)
+    if HAS_XBPS:
+        try:
+            with os.scandir(XBPS_REPO_INDEX_DIR) as it:
+                stamp.extend(sorted(
+                    (e.name, e.stat().st_mtime_ns) for e in it if e.is_dir()
+                ))
+        except OSError:
+            pass
+    return tuple(stamp)
+
+
+# Set for the duration of a cache=False call, so the cached queries it
+# makes in turn (xbps_info -> installed_package_info) refresh as well
+_REFRESHING: contextvars.ContextVar[bool] = contextvars.ContextVar("_REFRESHING", default=False)
+
+
+def cached_query(fn):
+    """Cache successful results of a read-only tool, keyed by its arguments.
+
+    Entries expire after _CACHE_TTL, or as soon as the package database or
+    repository index changes. The wrapped coroutine accepts `cache=False`
+    to bypass and refresh, which also applies to cached queries it calls.
+    """
+    @functools.wraps(fn)
+    async def wrapper(*args, cache: bool = True) -> CallToolResult:
+        key = (fn.__name__, args)
+        stamp = package_state_stamp()
+        cache = cache and not _REFRESHING.get()
+        if cache:
+            hit = _QUERY_CACHE.get(key)
+            if hit and time.monotonic() - hit[0] < _CACHE_TTL and hit[1] == stamp:
+                _QUERY_CACHE.move_to_end(key)
+                return hit[2]
+            result = await fn(*args)
+        else:
+            token = _REFRESHING.set(True)
+            try:
+                result = await fn(*args)
+            finally:
+                _REFRESHING.reset(token)
+        if not result.isError:
+            _QUERY_CACHE[key] = (time.monotonic(), stamp, result)
+            _QUERY_CACHE.move_to_end(key)
+            while len(_QUERY_CACHE) > _CACHE_MAX_ENTRIES:
+                _QUERY_CACHE.popitem(last=False)
+        return result
+
+    return wrapper
+
+
+@cached_query
 async def xbps_search(query: str) -> CallToolResult:
     """Search for packages."""
     if not query:
-        return CallToolResult(
-            content=[TextContent(type="text", text="Error: query is required")],
-            isError=True
-        )
+        return _err("Error: query is required")
 
     if HAS_XBPS:
         # Void Linux: use xbps-query
-        stdout, stderr, code = run_command(["xbps-query", "-Rs", query])
+        cmd = ["xbps-query", "-Rs", query]
     elif HAS_APT:
         # Debian/Ubuntu fallback: use apt-cache
-        stdout, stderr, code = run_command(["apt-cache", "search", query])
+        cmd = ["apt-cache", "search", query]
     else:
-        return CallToolResult(
-            content=[TextContent(type="text", text="No package manager available (xbps or apt)")],
-            isError=True
-        )
+        return _err("No package manager available (xbps or apt)")
 
+    # Limit output to first 20 results; a broad query can match thousands,
+    # so stop reading (and stop the search) once those are in hand
+    lines, more, stderr, code = await run_command_head(cmd, 20)
+
+    output = "\n".join(lines)
     if code != 0:
-        return CallToolResult(
-            content=[TextContent(type="text", text=f"Search failed: {stderr or stdout}")],
-            isError=True
-        )
+        return _err(f"Search failed: {stderr or output}")
 
-    if not stdout.strip():
-        return CallToolResult(
-            content=[TextContent(type="text", text=f"No packages found matching '{query}'")]
-        )
+    result = output.strip()
+    if not result:
+        return _ok(f"No packages found matching '{query}'")
 
-    # Limit output to first 20 results
-    lines = stdout.strip().split("\n")[:20]
-    result = "\n".join(lines)
-    if len(stdout.strip().split("\n")) > 20:
-        result += f"\n... and {len(stdout.strip().split(chr(10))) - 20} more results"
+    if more:
+        result += "\n... more results available (showing first 20)"
 
-    return CallToolResult(
-        content=[TextContent(type="text", text=result)]
-    )
+    return _ok(result)
 
 
+# Installed-package databases, and how to pull every name-like token out of
+# them: for the xbps plist that is every <key> (package names plus property
+# names), for dpkg every "Package:" stanza header
+XBPS_PKGDB = "/var/db/xbps/pkgdb-0.38.plist"
+DPKG_STATUS = "/var/lib/dpkg/status"
+_XBPS_PKGDB_KEY = re.compile(rb"<key>([^<]*)</key>")
+_DPKG_PACKAGE = re.compile(rb"^Package: (\S+)$", re.MULTILINE)
+# xbps-query -S also resolves virtual packages, listed as pkgvers
+# (awk-0_1) in each package's "provides" array
+_XBPS_PROVIDES = re.compile(rb"<key>provides</key>\s*<array>(.*?)</array>", re.DOTALL)
+_XBPS_PKGDB_STRING = re.compile(rb"<string>([^<]*)</string>")
+
+# Only a bare package name can be ruled out by the name set; pkgvers
+# (foo-1.0_1), version patterns (foo>=1.0) and arch-qualified names
+# (pkg:amd64) are left to the package manager
+_PLAIN_PACKAGE_NAME = re.compile(r"[A-Za-z0-9][A-Za-z0-9+._-]*")
+_PKGVER_SUFFIX = re.compile(r"-[^-]*_[0-9]+$")
+
+_PKGDB_NAMES: tuple[tuple[int, int], frozenset[str]] | None = None
+
+
+def installed_name_candidates() -> frozenset[str] | None:
+    """Superset of the installed (and, for xbps, virtual) package names.
+
+    A name missing from it is definitely not installed; a name present still
+    needs the package manager to confirm. Re-read only when the database
+    changes. None if it can't be read, in which case nothing is ruled out.
+    """
+    global _PKGDB_NAMES
+    if HAS_XBPS:
+        path, pattern = XBPS_PKGDB, _XBPS_PKGDB_KEY
+    elif HAS_APT:
+        path, pattern = DPKG_STATUS, _DPKG_PACKAGE
+    else:
+        return None
+
+    try:
+        st = os.stat(path)
+        stamp = (st.st_mtime_ns, st.st_size)
+        if _PKGDB_NAMES is not None and _PKGDB_NAMES[0] == stamp:
+            return _PKGDB_NAMES[1]
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    # Only trust an XML pkgdb; anything else can't rule packages out
+    if HAS_XBPS and not data.startswith(b"<?xml"):
+        return None
+
+    found = pattern.findall(data)
+    if HAS_XBPS:
+        for provides in _XBPS_PROVIDES.findall(data):
+            found += [pkgver.rpartition(b"-")[0] or pkgver
+                      for pkgver in _XBPS_PKGDB_STRING.findall(provides)]
+    names = frozenset(m.decode(errors="replace") for m in found)
+    _PKGDB_NAMES = (stamp, names)
+    return names
+
+
+@cached_query
+async def installed_package_info(package: str) -> CallToolResult:
+    """Get information about an installed package (error if not installed).
+
+    Shared by xbps_info and xbps_remove so both hit the same cached probe.
+    """
+    # Answer "not installed" from the package database without forking
+    if _PLAIN_PACKAGE_NAME.fullmatch(package) and not _PKGVER_SUFFIX.search(package):
+        candidates = await asyncio.to_thread(installed_name_candidates)
+        if candidates is not None and package not in candidates:
+            return _err(f"Package '{package}' is not installed")
+
+    if HAS_XBPS:
+        stdout, stderr, code = await run_command(["xbps-query", "-S", package])
+    elif HAS_APT:
+        stdout, stderr, code = await run_command(["dpkg", "-s", package])
+        if "not installed" in stderr.lower():
+            code = code or 1
+    else:
+        return _err("No package manager available")
+
+    if code != 0:
+        return _err(f"Package '{package}' is not installed")
+
+    return _ok(stdout.strip())
+
+
+@cached_query
 async def xbps_info(package: str) -> CallToolResult:
     """Get package information."""
     if not package:
-        return CallToolResult(
-            content=[TextContent(type="text", text="Error: package name is required")],
-            isError=True
-        )
+        return _err("Error: package name is required")
 
     if HAS_XBPS:
         # Try installed package first
-        stdout, stderr, code = run_command(["xbps-query", "-S", package])
-        if code != 0:
-            # Try repository
-            stdout, stderr, code = run_command(["xbps-query", "-RS", package])
+        installed = await installed_package_info(package)
+        if not installed.isError:
+            return installed
+        # Try repository
+        stdout, stderr, code = await run_command(["xbps-query", "-RS", package])
     elif HAS_APT:
-        stdout, stderr, code = run_command(["apt-cache", "show", package])
+        stdout, stderr, code = await run_command(["apt-cache", "show", package])
     else:
-        return CallToolResult(
-            content=[TextContent(type="text", text="No package manager available")],
-            isError=True
-        )
+        return _err("No package manager available")
 
     if code != 0:
-        return CallToolResult(
-            content=[TextContent(type="text", text=f"Package '{package}' not found")],
-            isError=True
-        )
+        return _err(f"Package '{package}' not found")
 
-    return CallToolResult(
-        content=[TextContent(type="text", text=stdout.strip())]
-    )
+    return _ok(stdout.strip())
 
 
 async def xbps_install(package: str) -> CallToolResult:
     """Install a package (dry-run only for safety)."""
     if not package:
-        return CallToolResult(
-            content=[TextContent(type="text", text="Error: package name is required")],
-            isError=True
-        )
+        return _err("Error: package name is required")
 
     # For safety, we only return the install command - actual installation
     # should be confirmed by the user through the Mycel confirmation flow
@@ -781,158 +1246,357 @@ async def xbps_install(package: str) -> CallToolResult:
     elif HAS_APT:
         cmd = f"sudo apt install {package}"
     else:
-        return CallToolResult(
-            content=[TextContent(type="text", text="No package manager available")],
-            isError=True
-        )
+        return _err("No package manager available")
 
     # Check if package exists first
     info_result = await xbps_info(package)
     if info_result.isError:
         return info_result
 
-    return CallToolResult(
-        content=[TextContent(
-            type="text",
-            text=f"To install '{package}', run:\n\n{cmd}\n\nPackage info:\n{info_result.content[0].text[:500]}"
-        )]
+    return _ok(
+        f"To install '{package}', run:\n\n{cmd}\n\nPackage info:\n{info_result.content[0].text[:500]}"
     )
 
 
+def _read_supervise(base: str) -> bytes | None:
+    """The 20-byte supervise/status record of the service directory `base`.
+
+    Like sv, first checks that runsv is alive: opening the supervise/ok
+    FIFO for writing fails with ENXIO when nothing has it open, and the
+    status record is then stale. Returns b"" in that case, and None when
+    the files can't be read (supervise/ is usually root-only).
+    """
+    supervise = os.path.join(base, "supervise")
+    try:
+        os.close(os.open(os.path.join(supervise, "ok"), os.O_WRONLY | os.O_NONBLOCK))
+    except OSError as e:
+        return b"" if e.errno == errno.ENXIO else None
+    try:
+        with open(os.path.join(supervise, "status"), "rb") as f:
+            record = f.read(20)
+    except OSError:
+        return None
+    return record if len(record) == 20 else None
+
+
+def _format_supervise(name: str, base: str, record: bytes) -> str:
+    """One service's part of the `sv status` line (svstatus_print in sv.c)."""
+    # Layout: tai64 seconds (BE) | nanoseconds (BE) | pid (LE) |
+    #         paused | want ('u'/'d') | got TERM | state (0 down, 1 run, 2 finish)
+    changed = int.from_bytes(record[0:8], "big") - TAI64_UNIX_OFFSET
+    pid = int.from_bytes(record[12:16], "little")
+    paused, want, term, state = record[16], record[17:18], record[18], record[19]
+    elapsed = max(int(time.time()) - changed, 0)
+    normally_up = not os.path.exists(os.path.join(base, "down"))
+
+    text = f"{('down', 'run', 'finish')[state] if state < 3 else 'unknown'}: {name}: "
+    if state:
+        text += f"(pid {pid}) "
+    text += f"{elapsed}s"
+    if pid and not normally_up:
+        text += ", normally down"
+    if not pid and normally_up:
+        text += ", normally up"
+    if pid and paused:
+        text += ", paused"
+    if not pid and want == b"u":
+        text += ", want up"
+    if pid and want == b"d":
+        text += ", want down"
+    if pid and term:
+        text += ", got TERM"
+    return text
+
+
+def runit_status(service: str) -> str | None:
+    """Format a runit service's state like `sv status`, without forking sv.
+
+    Reads the records runsv keeps in supervise/status for the service and,
+    if it has one, its log/ service. Returns None when they can't be read,
+    in which case callers fall back to `sv status`.
+    """
+    if not service or "/" in service:
+        return None
+    base = os.path.join(RUNIT_SERVICE_DIR, service)
+    record = _read_supervise(base)
+    if record is None:
+        return None
+    if not record:
+        return f"fail: {service}: runsv not running"
+
+    text = _format_supervise(service, base, record)
+    log_base = os.path.join(base, "log")
+    if os.path.isdir(log_base):
+        log_record = _read_supervise(log_base)
+        if not log_record:
+            return None
+        text += "; " + _format_supervise("log", log_base, log_record)
+    return text
+
+
 async def service_status(service: str) -> CallToolResult:
     """Get service status."""
     if not service:
-        return CallToolResult(
-            content=[TextContent(type="text", text="Error: service name is required")],
-            isError=True
-        )
+        return _err("Error: service name is required")
 
     if HAS_RUNIT:
-        stdout, stderr, code = run_command(["sv", "status", service])
+        status = runit_status(service)
+        if status is not None:
+            return _ok(status)
+        stdout, stderr, code = await run_command(["sv", "status", service])
     elif HAS_SYSTEMD:
-        stdout, stderr, code = run_command(["systemctl", "status", service, "--no-pager"])
+        stdout, stderr, code = await run_command(["systemctl", "status", service, "--no-pager"])
     else:
-        return CallToolResult(
-            content=[TextContent(type="text", text="No service manager available (runit or systemd)")],
-            isError=True
-        )
+        return _err("No service manager available (runit or systemd)")
 
     output = stdout or stderr
-    return CallToolResult(
-        content=[TextContent(type="text", text=output.strip() or "No output")]
-    )
+    return _ok(output.strip() or "No output")
 
 
 async def service_control(service: str, action: str) -> CallToolResult:
     """Control a service (returns command for safety)."""
     if not service:
-        return CallToolResult(
-            content=[TextContent(type="text", text="Error: service name is required")],
-            isError=True
-        )
+        return _err("Error: service name is required")
 
     if action not in ("up", "down", "restart"):
-        return CallToolResult(
-            content=[TextContent(type="text", text=f"Invalid action: {action}. Use: up, down, restart")],
-            isError=True
-        )
+        return _err(f"Invalid action: {action}. Use: up, down, restart")
+
+    if not (HAS_RUNIT or HAS_SYSTEMD):
+        return _err("No service manager available")
+
+    # Start the status lookup first; it may need an sv/systemctl fork,
+    # which then runs while the command is put together
+    status_task = asyncio.create_task(service_status(service))
 
     # Map actions for different init systems
     if HAS_RUNIT:
         cmd = f"sudo sv {action} {service}"
-    elif HAS_SYSTEMD:
+    else:
         systemd_action = {"up": "start", "down": "stop", "restart": "restart"}[action]
         cmd = f"sudo systemctl {systemd_action} {service}"
-    else:
-        return CallToolResult(
-            content=[TextContent(type="text", text="No service manager available")],
-            isError=True
-        )
 
     # Get current status
-    status_result = await service_status(service)
+    status_result = await status_task
 
-    return CallToolResult(
-        content=[TextContent(
-            type="text",
-            text=f"To {action} service '{service}', run:\n\n{cmd}\n\nCurrent status:\n{status_result.content[0].text}"
-        )]
+    return _ok(
+        f"To {action} service '{service}', run:\n\n{cmd}\n\nCurrent status:\n{status_result.content[0].text}"
     )
 
 
-async def system_info() -> CallToolResult:
-    """Get system information."""
-    info_parts = []
+def _os_release_fields() -> list[str]:
+    """NAME/VERSION/ID lines from /etc/os-release."""
+    return [
+        line.strip().decode("utf-8", "replace")
+        for line in os_release().split(b"\n")
+        if line.startswith((b"NAME=", b"VERSION=", b"ID="))
+    ]
+
+
+_MEMINFO_FIELDS = re.compile(rb"^(?:MemTotal|MemAvailable):[^\n]*", re.MULTILINE)
+
+
+def _read_meminfo() -> list[str]:
+    """MemTotal/MemAvailable lines from /proc/meminfo."""
+    # Both fields are within the first few lines; don't read the rest
+    with open("/proc/meminfo", "rb") as f:
+        head = f.read(512)
+    return [m.decode("ascii", "replace") for m in _MEMINFO_FIELDS.findall(head)]
+
+
+def _read_cpuinfo() -> list[str]:
+    """CPU model from /proc/cpuinfo."""
+    # The first processor block carries the model name; on many-core hosts
+    # the full file is tens of KB, so only scan a bounded prefix
+    with open("/proc/cpuinfo", "rb") as f:
+        head = f.read(4096)
+    i = head.find(b"model name")
+    if i < 0:
+        return []
+    colon = head.find(b":", i)
+    nl = head.find(b"\n", colon)
+    if colon < 0 or nl < 0:
+        return []
+    return [f"CPU: {head[colon + 1:nl].strip().decode('ascii', 'replace')}"]
+
+
+# Banners of `ldd --version`, matched without lower-casing the output
+_MUSL_RE = re.compile(r"musl", re.IGNORECASE)
+_GLIBC_RE = re.compile(r"glibc|GNU", re.IGNORECASE)
+
+
+def _elf_interpreter(path: str) -> bytes | None:
+    """PT_INTERP of an ELF executable (its dynamic loader), if it has one."""
+    with open(path, "rb") as f:
+        header = f.read(64)
+        if len(header) < 52 or header[:4] != b"\x7fELF":
+            return None
+        is64 = header[4] == 2
+        order = "<" if header[5] == 1 else ">"
+        if is64:
+            (phoff,) = struct.unpack_from(order + "Q", header, 32)
+            phentsize, phnum = struct.unpack_from(order + "HH", header, 54)
+        else:
+            (phoff,) = struct.unpack_from(order + "I", header, 28)
+            phentsize, phnum = struct.unpack_from(order + "HH", header, 42)
+        f.seek(phoff)
+        headers = f.read(phentsize * phnum)
+        for off in range(0, len(headers) - phentsize + 1, phentsize):
+            if struct.unpack_from(order + "I", headers, off)[0] != 3:  # PT_INTERP
+                continue
+            if is64:
+                (offset,) = struct.unpack_from(order + "Q", headers, off + 8)
+                (size,) = struct.unpack_from(order + "Q", headers, off + 32)
+            else:
+                (offset,) = struct.unpack_from(order + "I", headers, off + 4)
+                (size,) = struct.unpack_from(order + "I", headers, off + 16)
+            f.seek(offset)
+            return f.read(min(size, 4096)).rstrip(b"\0")
+    return None
 
-    # OS information
-    if os.path.exists("/etc/os-release"):
-        try:
-            with open("/etc/os-release") as f:
-                for line in f:
-                    if line.startswith(("NAME=", "VERSION=", "ID=")):
-                        info_parts.append(line.strip())
-        except Exception:
-            pass
 
-    # Kernel version
-    stdout, _, _ = run_command(["uname", "-r"])
-    if stdout:
-        info_parts.append(f"Kernel: {stdout.strip()}")
+def _libc_from_host() -> str | None:
+    """The host's C library, which the server's own interpreter need not share.
 
-    # Architecture
-    stdout, _, _ = run_command(["uname", "-m"])
-    if stdout:
-        info_parts.append(f"Architecture: {stdout.strip()}")
+    Goes by the loader the system shell is linked against; if that says
+    nothing (a static shell), by which loaders are installed, when only
+    one kind is.
+    """
+    for exe in ("/bin/sh", "/usr/bin/env"):
+        try:
+            interp = _elf_interpreter(exe)
+        except (OSError, struct.error):
+            continue
+        if interp:
+            if b"ld-musl" in interp:
+                return "musl"
+            if b"ld-linux" in interp or b"ld64.so" in interp:
+                return "glibc"
+    musl = glob.glob("/lib/ld-musl-*.so.1")
+    gnu = glob.glob("/lib*/ld-linux*.so.*") or glob.glob("/lib*/*-linux-gnu*/libc.so.6")
+    if musl and not gnu:
+        return "musl"
+    if gnu and not musl:
+        return "glibc"
+    return None
+
+
+def _libc_from_process() -> str | None:
+    """C library this interpreter is linked against, without forking."""
+    # glibc answers confstr; musl has no such name and raises/returns None
+    try:
+        if os.confstr("CS_GNU_LIBC_VERSION"):
+            return "glibc"
+    except (ValueError, OSError):
+        pass
+    try:
+        with open("/proc/self/maps", "rb") as f:
+            if b"musl" in f.read():
+                return "musl"
+    except OSError:
+        pass
+    return None
+
+
+async def _detect_libc() -> str | None:
+    """The host's musl or glibc, falling back to this process's own C library
+    and then to parsing `ldd --version`.
+    """
+    libc = _libc_from_host() or _libc_from_process()
+    if libc:
+        return libc
+    stdout, stderr, _ = await run_command(["ldd", "--version"])
+    # musl's ldd prints its banner to stderr
+    output = stdout + stderr
+    if _MUSL_RE.search(output):
+        return "musl"
+    if _GLIBC_RE.search(output):
+        return "glibc"
+    return None
+
+
+# Lines of system_info that can't change while the server runs
+_STATIC_INFO: tuple[list[str], list[str]] | None = None
+
+
+async def _static_system_info() -> tuple[list[str], list[str]]:
+    """The invariant part of system_info, as (lines before, lines after) the
+    memory figures. Kept for the life of the process once every probe has
+    succeeded; a failed or timed out probe is retried on the next call.
+    """
+    global _STATIC_INFO
+    if _STATIC_INFO is not None:
+        return _STATIC_INFO
+
+    head = []
+
+    # The probes are independent: run the file read (and the ldd fallback)
+    # concurrently, under one shared deadline rather than a timer per probe
+    try:
+        libc, cpuinfo = await with_timeout(asyncio.gather(
+            _detect_libc(),
+            asyncio.to_thread(_read_cpuinfo),
+            return_exceptions=True,
+        ), SYSTEM_INFO_TIMEOUT)
+    except asyncio.TimeoutError as e:
+        libc = cpuinfo = e
+        head.append(f"(system probes timed out after {SYSTEM_INFO_TIMEOUT}s)")
+
+    # OS information (usually already read for Void detection)
+    head.extend(_os_release_fields())
+
+    # Kernel version and architecture: one uname(2) call, no fork
+    uname = os.uname()
+    head.append(f"Kernel: {uname.release}")
+    head.append(f"Architecture: {uname.machine}")
 
     # Check for musl vs glibc
-    stdout, _, _ = run_command(["ldd", "--version"])
-    if "musl" in stdout.lower():
-        info_parts.append("C Library: musl")
-    elif "glibc" in stdout.lower() or "GNU" in stdout:
-        info_parts.append("C Library: glibc")
-
-    # Memory info
-    if os.path.exists("/proc/meminfo"):
-        try:
-            with open("/proc/meminfo") as f:
-                for line in f:
-                    if line.startswith(("MemTotal:", "MemAvailable:")):
-                        info_parts.append(line.strip())
-        except Exception:
-            pass
+    if libc and not isinstance(libc, BaseException):
+        head.append(f"C Library: {libc}")
 
     # CPU info
-    if os.path.exists("/proc/cpuinfo"):
-        try:
-            with open("/proc/cpuinfo") as f:
-                for line in f:
-                    if line.startswith("model name"):
-                        info_parts.append(f"CPU: {line.split(':')[1].strip()}")
-                        break
-        except Exception:
-            pass
+    tail = [] if isinstance(cpuinfo, BaseException) else list(cpuinfo)
 
     # Environment detection
-    info_parts.append("")
-    info_parts.append("--- Detected Environment ---")
-    info_parts.append(f"Void Linux: {'Yes' if IS_VOID else 'No'}")
-    info_parts.append(f"XBPS available: {'Yes' if HAS_XBPS else 'No'}")
-    info_parts.append(f"APT available: {'Yes' if HAS_APT else 'No'}")
-    info_parts.append(f"Runit available: {'Yes' if HAS_RUNIT else 'No'}")
-    info_parts.append(f"Systemd available: {'Yes' if HAS_SYSTEMD else 'No'}")
-
-    return CallToolResult(
-        content=[TextContent(type="text", text="\n".join(info_parts))]
+    tail.append("")
+    tail.append("--- Detected Environment ---")
+    tail.append(f"Void Linux: {'Yes' if IS_VOID else 'No'}")
+    tail.append(f"XBPS available: {'Yes' if HAS_XBPS else 'No'}")
+    tail.append(f"APT available: {'Yes' if HAS_APT else 'No'}")
+    tail.append(f"Runit available: {'Yes' if HAS_RUNIT else 'No'}")
+    tail.append(f"Systemd available: {'Yes' if HAS_SYSTEMD else 'No'}")
+
+    if not isinstance(libc, BaseException) and not isinstance(cpuinfo, BaseException):
+        _STATIC_INFO = (head, tail)
+    return head, tail
+
+
+async def system_info() -> CallToolResult:
+    """Get system information."""
+    # Only memory usage changes between calls; everything else is memoized
+    static, meminfo = await asyncio.gather(
+        _static_system_info(),
+        asyncio.to_thread(_read_meminfo),
+        return_exceptions=True,
     )
+    if isinstance(static, BaseException):
+        raise static
+    head, tail = static
+
+    info_parts = list(head)
+
+    # Memory info
+    if not isinstance(meminfo, BaseException):
+        info_parts.extend(meminfo)
+
+    info_parts.extend(tail)
+
+    return _ok("\n".join(info_parts))
 
 
 async def xbps_remove(package: str, recursive: bool = False) -> CallToolResult:
     """Remove a package (returns command for safety)."""
     if not package:
-        return CallToolResult(
-            content=[TextContent(type="text", text="Error: package name is required")],
-            isError=True
-        )
+        return _err("Error: package name is required")
 
     # For safety, we only return the remove command - actual removal
     # should be confirmed by the user through the Mycel confirmation flow
@@ -944,133 +1608,115 @@ async def xbps_remove(package: str, recursive: bool = False) -> CallToolResult:
         if recursive:
             cmd = f"sudo apt autoremove {package}"
     else:
-        return CallToolResult(
-            content=[TextContent(type="text", text="No package manager available")],
-            isError=True
-        )
+        return _err("No package manager available")
 
     # Check if package is installed
-    if HAS_XBPS:
-        stdout, stderr, code = run_command(["xbps-query", package])
-        if code != 0:
-            return CallToolResult(
-                content=[TextContent(type="text", text=f"Package '{package}' is not installed")],
-                isError=True
-            )
-        pkg_info = stdout.strip()
-    elif HAS_APT:
-        stdout, stderr, code = run_command(["dpkg", "-s", package])
-        if code != 0 or "not installed" in stderr.lower():
-            return CallToolResult(
-                content=[TextContent(type="text", text=f"Package '{package}' is not installed")],
-                isError=True
-            )
-        pkg_info = stdout.strip()[:500]
-    else:
-        pkg_info = "Unable to verify installation status"
-
-    return CallToolResult(
-        content=[TextContent(
-            type="text",
-            text=f"To remove '{package}', run:\n\n{cmd}\n\nPackage info:\n{pkg_info}"
-        )]
+    info = await installed_package_info(package)
+    if info.isError:
+        return info
+    pkg_info = info.content[0].text
+    if HAS_APT and not HAS_XBPS:
+        pkg_info = pkg_info[:500]
+
+    return _ok(
+        f"To remove '{package}', run:\n\n{cmd}\n\nPackage info:\n{pkg_info}"
     )
 
 
+@cached_query
 async def xbps_list_installed(pattern: str | None = None, limit: int = 50) -> CallToolResult:
     """List installed packages."""
+    # A limit below 1 would read nothing and report an empty system
+    if limit < 1:
+        return _err("Error: limit must be at least 1")
+
     if HAS_XBPS:
-        if pattern:
-            # List with pattern filter
-            stdout, stderr, code = run_command(["xbps-query", "-s", pattern])
-        else:
-            # List all installed
-            stdout, stderr, code = run_command(["xbps-query", "-l"])
+        cmd = ["xbps-query", "-s", pattern] if pattern else ["xbps-query", "-l"]
     elif HAS_APT:
-        if pattern:
-            stdout, stderr, code = run_command(["dpkg", "-l", f"*{pattern}*"])
-        else:
-            stdout, stderr, code = run_command(["dpkg", "-l"])
+        cmd = ["dpkg", "-l", f"*{pattern}*"] if pattern else ["dpkg", "-l"]
     else:
-        return CallToolResult(
-            content=[TextContent(type="text", text="No package manager available")],
-            isError=True
-        )
+        return _err("No package manager available")
 
+    # Read only as many lines as will be shown instead of decoding the
+    # full list (often 1000+ packages)
+    lines, more, stderr, code = await run_command_head(cmd, limit)
+
+    output = "\n".join(lines)
     if code != 0:
-        return CallToolResult(
-            content=[TextContent(type="text", text=f"Failed to list packages: {stderr or stdout}")],
-            isError=True
-        )
+        return _err(f"Failed to list packages: {stderr or output}")
 
-    if not stdout.strip():
+    result = output.strip()
+    if not result:
         msg = f"No installed packages matching '{pattern}'" if pattern else "No packages installed"
-        return CallToolResult(
-            content=[TextContent(type="text", text=msg)]
-        )
-
-    # Limit output
-    lines = stdout.strip().split("\n")
-    total = len(lines)
-    limited_lines = lines[:limit]
-    result = "\n".join(limited_lines)
+        return _ok(msg)
 
-    if total > limit:
-        result += f"\n\n... showing {limit} of {total} packages"
+    if more:
+        result += f"\n\n... showing first {limit} packages"
 
-    return CallToolResult(
-        content=[TextContent(type="text", text=result)]
-    )
+    return _ok(result)
 
 
 async def service_list(filter_pattern: str | None = None, running_only: bool = False) -> CallToolResult:
     """List all services and their status."""
     services = []
 
+    # Substring match with glob support, compiled once for the whole listing
+    name_filter = None
+    if filter_pattern:
+        name_filter = re.compile(fnmatch.translate(f"*{filter_pattern}*"), re.IGNORECASE)
+
     if HAS_RUNIT:
         # Runit: services are directories in /var/service (enabled) or /etc/sv (available)
-        service_dirs = []
+        # name -> enabled
+        service_map: dict[str, bool] = {}
+
+        # scandir exposes the entry type from the dirent, avoiding a stat
+        # per service for the is-dir/is-link checks
 
         # Check enabled services
-        enabled_dir = "/var/service"
-        if os.path.exists(enabled_dir):
-            try:
-                for name in os.listdir(enabled_dir):
-                    svc_path = os.path.join(enabled_dir, name)
-                    if os.path.isdir(svc_path) or os.path.islink(svc_path):
-                        service_dirs.append((name, True))
-            except PermissionError:
-                pass
+        try:
+            with os.scandir("/var/service") as it:
+                for entry in it:
+                    if entry.is_dir() or entry.is_symlink():
+                        service_map[entry.name] = True
+        except (FileNotFoundError, PermissionError):
+            pass
 
         # Check available but not enabled
-        available_dir = "/etc/sv"
-        if os.path.exists(available_dir):
-            enabled_names = {s[0] for s in service_dirs}
-            try:
-                for name in os.listdir(available_dir):
-                    if name not in enabled_names:
-                        svc_path = os.path.join(available_dir, name)
-                        if os.path.isdir(svc_path):
-                            service_dirs.append((name, False))
-            except PermissionError:
-                pass
-
-        for name, enabled in service_dirs:
-            if filter_pattern and filter_pattern.lower() not in name.lower():
-                continue
+        try:
+            with os.scandir("/etc/sv") as it:
+                for entry in it:
+                    if entry.is_dir():
+                        service_map.setdefault(entry.name, False)
+        except (FileNotFoundError, PermissionError):
+            pass
 
-            if enabled:
-                stdout, _, code = run_command(["sv", "status", name], timeout=5)
-                status = stdout.strip() if code == 0 else "unknown"
-                is_running = "run:" in status.lower()
-            else:
-                status = "disabled (not enabled)"
-                is_running = False
+        service_dirs = [
+            (name, enabled) for name, enabled in service_map.items()
+            if not name_filter or name_filter.match(name)
+        ]
+
+        # Query enabled services concurrently, capping parallel forks
+        sem = asyncio.Semaphore(SERVICE_STATUS_CONCURRENCY)
+
+        async def _status(name: str, enabled: bool) -> tuple[str, bool]:
+            if not enabled:
+                return "disabled (not enabled)", False
+            status = runit_status(name)
+            if status is None:
+                # The status is sv's first line; nothing past it is needed
+                async with sem:
+                    lines, _, _, code = await run_command_head(["sv", "status", name], 1, timeout=5)
+                status = lines[0].strip() if code == 0 and lines else "unknown"
+            return status, "run:" in status.lower()
 
+        statuses = await asyncio.gather(*(_status(n, e) for n, e in service_dirs))
+
+        for (name, _), (status, is_running) in zip(service_dirs, statuses):
             if running_only and not is_running:
                 continue
 
-            services.append(f"{'[*]' if is_running else '[ ]'} {name}: {status}")
+            services.append((name.lower(), f"{'[*]' if is_running else '[ ]'} {name}: {status}"))
 
     elif HAS_SYSTEMD:
         # Systemd: use systemctl list-units
@@ -1078,7 +1724,7 @@ async def service_list(filter_pattern: str | None = None, running_only: bool = F
         if not running_only:
             cmd.append("--all")
 
-        stdout, stderr, code = run_command(cmd, timeout=10)
+        stdout, stderr, code = await run_command(cmd, timeout=10)
         if code == 0:
             for line in stdout.strip().split("\n"):
                 if not line.strip():
@@ -1086,19 +1732,16 @@ async def service_list(filter_pattern: str | None = None, running_only: bool = F
                 parts = line.split()
                 if len(parts) >= 4:
                     name = parts[0].replace(".service", "")
-                    if filter_pattern and filter_pattern.lower() not in name.lower():
+                    if name_filter and not name_filter.match(name):
                         continue
                     load_state = parts[1]
                     active_state = parts[2]
                     sub_state = parts[3]
                     is_running = active_state == "active"
                     marker = "[*]" if is_running else "[ ]"
-                    services.append(f"{marker} {name}: {active_state} ({sub_state})")
+                    services.append((name.lower(), f"{marker} {name}: {active_state} ({sub_state})"))
     else:
-        return CallToolResult(
-            content=[TextContent(type="text", text="No service manager available (runit or systemd)")],
-            isError=True
-        )
+        return _err("No service manager available (runit or systemd)")
 
     if not services:
         msg = "No services found"
@@ -1106,12 +1749,10 @@ async def service_list(filter_pattern: str | None = None, running_only: bool = F
             msg += f" matching '{filter_pattern}'"
         if running_only:
             msg += " (running only)"
-        return CallToolResult(
-            content=[TextContent(type="text", text=msg)]
-        )
+        return _ok(msg)
 
-    # Sort alphabetically
-    services.sort(key=lambda s: s.lower())
+    # Sort alphabetically by service name (entries are (sort key, line))
+    services.sort()
 
     header = "Services"
     if filter_pattern:
@@ -1120,13 +1761,31 @@ async def service_list(filter_pattern: str | None = None, running_only: bool = F
         header += " (running only)"
     header += f" ({len(services)} total):\n"
 
-    return CallToolResult(
-        content=[TextContent(type="text", text=header + "\n".join(services))]
-    )
+    return _ok(header + "\n".join(line for _, line in services))
+
+
+def use_pidfd_child_watcher() -> None:
+    """Track subprocess exits with pidfds instead of a thread per child.
+
+    Python 3.12+ already does this by default (and deprecates watchers),
+    so this only applies to 3.10/3.11 on kernels with pidfd_open (5.3+).
+    """
+    if sys.platform != "linux" or sys.version_info >= (3, 12):
+        return
+    if not hasattr(asyncio, "PidfdChildWatcher") or not hasattr(os, "pidfd_open"):
+        return
+    try:
+        os.close(os.pidfd_open(os.getpid()))
+    except OSError:
+        return
+    watcher = asyncio.PidfdChildWatcher()
+    watcher.attach_loop(asyncio.get_running_loop())
+    asyncio.get_event_loop_policy().set_child_watcher(watcher)
 
 
 async def main():
     """Run the MCP server."""
+    use_pidfd_child_watcher()
     async with stdio_server() as (read_stream, write_stream):
         await server.run(
             read_stream,
@@ -6,19 +6,258 @@ This is a simple Python CLI for development/testing.
 The production CLI will be built into mycel-runtime (Rust).
 """
 
-import argparse
-import json
 import os
 import sys
-import socket
-from pathlib import Path
+
+# Everything else (argparse, socket, json) is imported where it's used, so
+# one-shot invocations like --version don't pay for modules they never touch
+
+# orjson serializes straight to bytes, several times faster than json;
+# fall back to the stdlib when it isn't installed
+try:
+    import orjson
+    _loads = orjson.loads
+
+    def _frame(obj) -> bytes:
+        """Serialize one newline-terminated request."""
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+
+    def _pretty(obj) -> str:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2).decode()
+except ImportError:
+    import json
+
+    def _frame(obj) -> bytes:
+        """Serialize one newline-terminated request."""
+        return (json.dumps(obj) + '\n').encode()
+    _loads = json.loads
+
+    def _pretty(obj) -> str:
+        return json.dumps(obj, indent=2)
 
 # Dev mode uses /tmp, production uses /run/mycel
 SOCKET_PATH = os.environ.get("MYCEL_SOCKET", "/tmp/mycel-dev.sock")
 AUTH_TOKEN = os.environ.get("MYCEL_AUTH_TOKEN", "")
 VERSION = "0.1.0"
 
-BANNER = """
+# LLM responses can run to hundreds of KB; read them in large slices
+RECV_SIZE = 65536
+SOCKET_RCVBUF = 262144
+SOCKET_SNDBUF = 262144
+
+# A runtime that is up accepts at once; don't wait the full reply timeout
+# on one that is wedged before it has even taken the connection
+CONNECT_TIMEOUT = 5
+REPLY_TIMEOUT = 120  # LLM responses can take a while
+
+# One-shot queries within this many seconds of each other share a session
+SESSION_TTL = 30 * 60
+
+EXIT_COMMANDS = frozenset(('quit', 'exit'))
+
+# chat --batch-ms: most lines gathered into one send
+BATCH_MAX_LINES = 32
+
+
+class MycelClient:
+    """Connection to the Mycel runtime over its Unix socket.
+
+    The socket is opened (and authenticated) on first use and then kept
+    open, so a chat session pays for connect + auth once rather than on
+    every message. The runtime answers each newline-framed request on the
+    same connection, in order.
+    """
+
+    def __init__(self, socket_path: str = SOCKET_PATH, token: str = AUTH_TOKEN):
+        self.socket_path = socket_path
+        self.token = token
+        self.sock = None
+        self.authed = False
+        self._rfile = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._rfile is not None:
+            self._rfile.close()
+        if self.sock is not None:
+            self.sock.close()
+        self.sock = None
+        self._rfile = None
+        self.authed = False
+
+    def _connect(self):
+        import socket
+        # Python sockets are already non-inheritable; SOCK_CLOEXEC sets it
+        # atomically at creation where the platform has it
+        self.sock = socket.socket(socket.AF_UNIX,
+                                  socket.SOCK_STREAM | getattr(socket, 'SOCK_CLOEXEC', 0))
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_RCVBUF)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_SNDBUF)
+        self.sock.settimeout(CONNECT_TIMEOUT)
+        self.sock.connect(self.socket_path)
+        self.sock.settimeout(REPLY_TIMEOUT)
+        # Responses are newline-framed: let the C-level buffered reader
+        # (recv_into in RECV_SIZE slices) find the line boundaries, and
+        # keep any bytes past a line for the next response
+        self._rfile = self.sock.makefile('rb', buffering=RECV_SIZE)
+
+    def _read_reply(self) -> dict:
+        while True:
+            line = self._rfile.readline()
+            if not line:
+                raise ConnectionError("Connection closed by runtime")
+            reply = _loads(line)
+            # Streamed chats send ChatChunk deltas ahead of the full Chat
+            if reply.get("type") != "ChatChunk":
+                return reply
+
+    def _roundtrip(self, request: dict) -> dict:
+        self.sock.sendall(_frame(request))
+        return self._read_reply()
+
+    def request(self, request: dict, need_auth: bool = True) -> dict:
+        """Send a request to the Mycel runtime and return its response."""
+        return self.request_many([request], need_auth)[0]
+
+    def request_many(self, requests: list, need_auth: bool = True) -> list:
+        """Send requests back to back and return their responses in order.
+
+        All of them go out in a single write and the runtime answers them
+        in order, so a batch costs one send instead of a round trip each.
+        On failure the list ends early with an Error response.
+        """
+        responses = []
+        try:
+            if self.sock is None:
+                self._connect()
+
+            # Authenticate first if needed and we have a token
+            if need_auth and self.token and not self.authed:
+                self._roundtrip({"type": "Authenticate", "token": self.token})
+                self.authed = True
+
+            self.sock.sendall(b''.join(map(_frame, requests)))
+            for _ in requests:
+                responses.append(self._read_reply())
+        except FileNotFoundError:
+            self.close()
+            responses.append({"type": "Error", "message": f"Mycel runtime not running. Socket not found: {self.socket_path}"})
+        except TimeoutError:
+            # A late reply would be mistaken for the next one; start over
+            self.close()
+            responses.append({"type": "Error", "message": "Request timed out"})
+        except Exception as e:
+            self.close()
+            responses.append({"type": "Error", "message": str(e)})
+        return responses
+
+
+def cache_dir() -> str:
+    return os.path.join(os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"), "mycel")
+
+
+def oneshot_session_id() -> str:
+    """Session id shared by one-shot queries made close together.
+
+    The runtime otherwise starts a fresh session per connection, so each
+    `mycel "..."` would lose the context of the one before it.
+    """
+    import time
+
+    path = os.path.join(cache_dir(), "session_id")
+    try:
+        if time.time() - os.stat(path).st_mtime < SESSION_TTL:
+            with open(path) as f:
+                session_id = f.read().strip()
+            if session_id:
+                os.utime(path)
+                return session_id
+    except OSError:
+        pass
+
+    import secrets
+    session_id = secrets.token_hex(16)
+    try:
+        os.makedirs(cache_dir(), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(session_id)
+    except OSError:
+        pass
+    return session_id
+
+
+def send_request(request: dict, need_auth: bool = True) -> dict:
+    """Send a single request to the Mycel runtime via Unix socket."""
+    with MycelClient() as client:
+        return client.request(request, need_auth)
+
+
+def chat_request(user_input: str) -> dict:
+    """Build a Chat request, honouring an @local/@cloud provider prefix."""
+    provider = "auto"
+    if user_input.startswith("@local "):
+        provider = "local"
+        user_input = user_input[7:]
+    elif user_input.startswith("@cloud "):
+        provider = "cloud"
+        user_input = user_input[7:]
+
+    return {
+        "type": "Chat",
+        "message": user_input,
+        "provider": provider
+    }
+
+
+class BatchReader:
+    """Reads stdin in bursts for chat --batch-ms.
+
+    Works on fd 0 with its own buffer rather than through input() or
+    sys.stdin: lines those have already pulled into their buffer are
+    invisible to select(), so a pasted or piped burst would never batch.
+    """
+
+    def __init__(self, wait: float):
+        self.wait = wait
+        self.buf = b""
+
+    def _line(self, timeout) -> bytes:
+        """Next line; b"" at EOF or if nothing arrives within `timeout`."""
+        import select
+
+        while b"\n" not in self.buf:
+            if timeout is not None and not select.select([0], [], [], timeout)[0]:
+                return b""
+            chunk = os.read(0, RECV_SIZE)
+            if not chunk:
+                # EOF: hand out any unterminated last line, then b""
+                line, self.buf = self.buf, b""
+                return line
+            self.buf += chunk
+        line, _, self.buf = self.buf.partition(b"\n")
+        return line + b"\n"
+
+    def read_batch(self) -> list:
+        """Block for one line, then take any that follow within the wait."""
+        line = self._line(None)
+        if not line:
+            raise EOFError
+        lines = [line]
+        while len(lines) < BATCH_MAX_LINES:
+            line = self._line(self.wait)
+            if not line:
+                break
+            lines.append(line)
+        return [line.decode(errors="replace") for line in lines]
+
+
+def banner() -> str:
+    return """
     ███╗   ███╗██╗   ██╗ ██████╗███████╗██╗
     ████╗ ████║╚██╗ ██╔╝██╔════╝██╔════╝██║
     ██╔████╔██║ ╚████╔╝ ██║     █████╗  ██║
@@ -29,107 +268,66 @@ BANNER = """
     The intelligent network beneath everything.
 """
 
-def send_request(request: dict, need_auth: bool = True) -> dict:
-    """Send a request to the Mycel runtime via Unix socket."""
-    try:
-        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
-        sock.settimeout(120)  # 2 min timeout for LLM responses
-        sock.connect(SOCKET_PATH)
-
-        # Authenticate first if needed and we have a token
-        if need_auth and AUTH_TOKEN:
-            auth_req = {"type": "Authenticate", "token": AUTH_TOKEN}
-            sock.sendall(json.dumps(auth_req).encode() + b'\n')
-            auth_resp = b''
-            while b'\n' not in auth_resp:
-                chunk = sock.recv(4096)
-                if not chunk:
-                    break
-                auth_resp += chunk
-
-        # Send request
-        sock.sendall(json.dumps(request).encode() + b'\n')
-
-        # Receive response
-        response = b''
-        while True:
-            chunk = sock.recv(4096)
-            if not chunk:
-                break
-            response += chunk
-            if b'\n' in chunk:
-                break
-
-        sock.close()
-        return json.loads(response.decode())
-    except FileNotFoundError:
-        return {"type": "Error", "message": f"Mycel runtime not running. Socket not found: {SOCKET_PATH}"}
-    except socket.timeout:
-        return {"type": "Error", "message": "Request timed out"}
-    except Exception as e:
-        return {"type": "Error", "message": str(e)}
-
 
 def cmd_chat(args):
     """Interactive chat mode."""
-    print(BANNER)
+    # Only worth drawing for a person at a terminal, not a pipe or a log
+    if sys.stdout.isatty():
+        print(banner())
     print("Type 'quit' or 'exit' to leave.")
     print("Prefix with @local or @cloud to force a provider.\n")
 
-    while True:
-        try:
-            user_input = input("mycel> ").strip()
-        except (EOFError, KeyboardInterrupt):
-            print("\nThe network rests. Goodbye!")
-            break
-
-        if not user_input:
-            continue
-        if user_input.lower() in ('quit', 'exit'):
-            print("The network rests. Goodbye!")
-            break
-
-        # Check for provider prefix
-        provider = "auto"
-        if user_input.startswith("@local "):
-            provider = "local"
-            user_input = user_input[7:]
-        elif user_input.startswith("@cloud "):
-            provider = "cloud"
-            user_input = user_input[7:]
-
-        response = send_request({
-            "type": "Chat",
-            "message": user_input,
-            "provider": provider
-        })
-
-        if response.get("type") == "Error":
-            print(f"\nError: {response.get('message', 'Unknown error')}\n")
-        elif response.get("type") == "Chat":
-            print(f"\n{response.get('response', '')}\n")
-        else:
-            print(f"\n{response}\n")
+    # Pasted text arrives as a burst of lines; with --batch-ms they are
+    # gathered and sent together instead of one round trip per line
+    batch_ms = getattr(args, 'batch_ms', 0)
+    batcher = BatchReader(batch_ms / 1000) if batch_ms else None
 
+    # One connection for the whole session
+    with MycelClient() as client:
+        while True:
+            try:
+                if batcher:
+                    print("mycel> ", end="", flush=True)
+                    lines = batcher.read_batch()
+                else:
+                    lines = [input("mycel> ")]
+            except (EOFError, KeyboardInterrupt):
+                print("\nThe network rests. Goodbye!")
+                break
 
-def cmd_run(args):
-    """Run a single command."""
-    user_input = " ".join(args.command)
+            requests = []
+            leaving = False
+            for user_input in lines:
+                user_input = user_input.strip()
+                if not user_input:
+                    continue
+                # Anything longer can't be an exit word; skip lowering it
+                if len(user_input) <= 4 and user_input.lower() in EXIT_COMMANDS:
+                    leaving = True
+                    break
+                requests.append(chat_request(user_input))
+
+            for response in client.request_many(requests) if requests else ():
+                if response.get("type") == "Error":
+                    print(f"\nError: {response.get('message', 'Unknown error')}\n")
+                elif response.get("type") == "Chat":
+                    print(f"\n{response.get('response', '')}\n")
+                else:
+                    print(f"\n{response}\n")
+
+            if leaving:
+                print("The network rests. Goodbye!")
+                break
 
-    # Check for provider prefix
-    provider = "auto"
-    if user_input.startswith("@local "):
-        provider = "local"
-        user_input = user_input[7:]
-    elif user_input.startswith("@cloud "):
-        provider = "cloud"
-        user_input = user_input[7:]
 
-    response = send_request({
-        "type": "Chat",
-        "message": user_input,
-        "provider": provider
-    })
+def cmd_run(args):
+    """Run a single command."""
+    # Both go out in one write; only the Chat reply matters
+    with MycelClient() as client:
+        response = client.request_many([
+            {"type": "SetSession", "id": oneshot_session_id()},
+            chat_request(" ".join(args.command)),
+        ])[-1]
 
     if response.get("type") == "Error":
         print(f"Error: {response.get('message', 'Unknown error')}", file=sys.stderr)
@@ -137,7 +335,7 @@ def cmd_run(args):
     elif response.get("type") == "Chat":
         print(response.get('response', ''))
     else:
-        print(json.dumps(response, indent=2))
+        print(_pretty(response))
 
 
 def cmd_status(args):
@@ -157,6 +355,10 @@ def cmd_status(args):
         print(f"Unexpected response: {response}")
 
 
+MESH_COMMANDS = ('status', 'add-device', 'join')
+COLLECTIVE_COMMANDS = ('status', 'share')
+
+
 def cmd_mesh(args):
     """Mesh network commands."""
     if args.mesh_cmd == "status":
@@ -210,7 +412,119 @@ def cmd_collective(args):
             print(f"Shared {response.get('count', 0)} patterns to the collective.")
 
 
+def _add_chat_parser(subparsers):
+    # Chat (default)
+    chat_parser = subparsers.add_parser('chat', help='Interactive chat mode')
+    chat_parser.add_argument('--batch-ms', type=int, default=0, metavar='N',
+                             help='Send lines arriving within N ms of each other as one batch '
+                                  '(reads stdin directly, without line editing)')
+    chat_parser.set_defaults(func=cmd_chat)
+
+
+def _add_run_parser(subparsers):
+    run_parser = subparsers.add_parser('run', help='Run a single command')
+    run_parser.add_argument('command', nargs='+', help='Command to run')
+    run_parser.set_defaults(func=cmd_run)
+
+
+def _add_status_parser(subparsers):
+    status_parser = subparsers.add_parser('status', help='Show runtime status')
+    status_parser.set_defaults(func=cmd_status)
+
+
+def _add_mesh_parser(subparsers):
+    mesh_parser = subparsers.add_parser('mesh', help='Mesh network commands')
+    mesh_parser.add_argument('mesh_cmd', choices=MESH_COMMANDS,
+                            help='Mesh subcommand')
+    mesh_parser.set_defaults(func=cmd_mesh)
+
+
+def _add_collective_parser(subparsers):
+    collective_parser = subparsers.add_parser('collective', help='Collective network commands')
+    collective_parser.add_argument('collective_cmd', choices=COLLECTIVE_COMMANDS,
+                                   help='Collective subcommand')
+    collective_parser.set_defaults(func=cmd_collective)
+
+
+# In the order they appear in --help
+SUBCOMMAND_PARSERS = {
+    'chat': _add_chat_parser,
+    'run': _add_run_parser,
+    'status': _add_status_parser,
+    'mesh': _add_mesh_parser,
+    'collective': _add_collective_parser,
+}
+
+
+def _sniff_subcommand(argv):
+    """The subcommand named by the first non-flag argument, if any."""
+    for arg in argv:
+        if not arg.startswith('-'):
+            return arg if arg in SUBCOMMAND_PARSERS else None
+    return None
+
+
+def help_cache_path() -> str:
+    """Where the rendered top-level --help is kept.
+
+    argparse wraps to the terminal width and names the program after
+    argv[0], so both are part of the key along with the version. VERSION
+    rarely changes, so the script's own mtime is in it too: editing any
+    help text invalidates the cache.
+    """
+    import shutil
+
+    prog = os.path.basename(sys.argv[0])
+    columns = shutil.get_terminal_size().columns
+    mtime = os.stat(__file__).st_mtime_ns
+    return os.path.join(cache_dir(), f"help-{VERSION}-{mtime}-{prog}-{columns}.txt")
+
+
+def fast_dispatch(argv) -> bool:
+    """Run status/mesh/collective without argparse.
+
+    Their grammar is one fixed word at most, so a well-formed call can be
+    routed by hand. Returns False for anything else, leaving argparse to
+    produce the usage error.
+    """
+    if argv == ['status']:
+        cmd_status(None)
+        return True
+    if len(argv) != 2:
+        return False
+
+    name, sub = argv
+    if name == 'mesh' and sub in MESH_COMMANDS:
+        class Args:
+            mesh_cmd = sub
+        cmd_mesh(Args())
+        return True
+    if name == 'collective' and sub in COLLECTIVE_COMMANDS:
+        class Args:
+            collective_cmd = sub
+        cmd_collective(Args())
+        return True
+    return False
+
+
 def main():
+    if sys.argv[1:] == ['--version']:
+        print(f'Mycel CLI {VERSION}')
+        return
+
+    show_help = sys.argv[1:] in (['-h'], ['--help'])
+    if show_help:
+        help_path = help_cache_path()
+        try:
+            with open(help_path, 'rb') as f:
+                sys.stdout.buffer.write(f.read())
+            return
+        except OSError:
+            pass
+
+    if fast_dispatch(sys.argv[1:]):
+        return
+
     # Check for direct query mode first (most common use case)
     if len(sys.argv) > 1 and sys.argv[1] not in ('chat', 'run', 'status', 'mesh', 'collective', '-h', '--help', '--version'):
         # Direct query: mycel "tell me a joke"
@@ -219,6 +533,7 @@ def main():
         cmd_run(Args())
         return
 
+    import argparse
     parser = argparse.ArgumentParser(
         description="Mycel CLI - The intelligent network beneath everything",
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -240,30 +555,32 @@ Environment:
 
     subparsers = parser.add_subparsers(dest='cmd')
 
-    # Chat (default)
-    chat_parser = subparsers.add_parser('chat', help='Interactive chat mode')
-    chat_parser.set_defaults(func=cmd_chat)
+    # Only the invoked subcommand's parser is needed; build them all only
+    # when there is none (top-level help, no arguments)
+    invoked = _sniff_subcommand(sys.argv[1:])
+    for name, add_parser in SUBCOMMAND_PARSERS.items():
+        if invoked is None or name == invoked:
+            add_parser(subparsers)
 
-    # Run
-    run_parser = subparsers.add_parser('run', help='Run a single command')
-    run_parser.add_argument('command', nargs='+', help='Command to run')
-    run_parser.set_defaults(func=cmd_run)
-
-    # Status
-    status_parser = subparsers.add_parser('status', help='Show runtime status')
-    status_parser.set_defaults(func=cmd_status)
-
-    # Mesh
-    mesh_parser = subparsers.add_parser('mesh', help='Mesh network commands')
-    mesh_parser.add_argument('mesh_cmd', choices=['status', 'add-device', 'join'],
-                            help='Mesh subcommand')
-    mesh_parser.set_defaults(func=cmd_mesh)
-
-    # Collective
-    collective_parser = subparsers.add_parser('collective', help='Collective network commands')
-    collective_parser.add_argument('collective_cmd', choices=['status', 'share'],
-                                   help='Collective subcommand')
-    collective_parser.set_defaults(func=cmd_collective)
+    if show_help:
+        # Render once and keep it, so the next --help never reaches argparse
+        try:
+            os.makedirs(cache_dir(), exist_ok=True)
+            tmp_path = f"{help_path}.{os.getpid()}"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(parser.format_help())
+            os.replace(tmp_path, help_path)
+        except OSError:
+            pass
+        # Every edit or terminal width gets its own key; drop the entries
+        # this one supersedes so the cache dir doesn't grow without bound
+        try:
+            for name in os.listdir(cache_dir()):
+                path = os.path.join(cache_dir(), name)
+                if name.startswith("help-") and name.endswith(".txt") and path != help_path:
+                    os.unlink(path)
+        except OSError:
+            pass
 
     args = parser.parse_args()
 